@@ -0,0 +1,170 @@
+"""
+Offline benchmark for the autonomous routines in src/main.py.
+
+Loads main.py against the simulated vex module in sim/vex, attaches a
+drivetrain physics model and runs routines on the virtual clock, much faster
+than real time. For every routine it reports the simulated duration, the
+time spent in each step (planned and actual for autonRoutines, each
+statement for plain functions) and the final pose (true pose from the
+physics model and the pose estimated by main.odometry).
+
+usage:
+    python sim/harness.py                       # Left, Right, FullautonV1, fullautonV2
+    python sim/harness.py Left turn:90 turn:-135
+    python sim/harness.py fullautonV2 --csv steps.csv --sd sd_out
+    python sim/harness.py turn:90 --plant plant.json  # drivetrain fitted by src/sysid.py
+    python sim/harness.py --check               # only run main.checkRoutines(), exit 1 on problems
+"""
+
+import argparse
+import csv
+import importlib.util
+import linecache
+import os
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(SIM_DIR), "src", "main.py")
+if SIM_DIR not in sys.path:
+    sys.path.insert(0, SIM_DIR)
+
+import vex                              # noqa: E402  (the simulated one in sim/vex)
+from plant import DrivetrainModel, TurnPlant        # noqa: E402
+
+DEFAULT_ROUTINES = ["Left", "Right", "FullautonV1", "fullautonV2"]
+
+
+def loadMain(model: DrivetrainModel = None, sdDirectory: str = None):
+    """Reset the simulation, execute a fresh copy of main.py and attach the drivetrain model."""
+    vex.world.reset()
+    spec = importlib.util.spec_from_file_location("main", MAIN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["main"] = module
+    spec.loader.exec_module(module)
+    model = model if model is not None else DrivetrainModel(wheelDiameter=module.wheelDiameter)
+    model.reset()
+    vex.world.attachDrivetrain(module.left, module.right, module.gyro, model)
+    module.odometry.reset()
+    module.brain.sdcard.directory = sdDirectory
+    return module
+
+
+def resolveRoutine(module, name: str):
+    """Return (label, callable) for a routine name or 'turn:<angle>'."""
+    if name.startswith("turn:"):
+        angle = float(name.split(":", 1)[1])
+
+        def turn():
+            module.rotatePID.run(angle, 2)
+        return name, turn
+    routine = getattr(module, name, None)
+    if not callable(routine):      # plain functions and autonRoutines
+        raise SystemExit("unknown routine: %s" % name)
+    return name, routine
+
+
+class stepProfiler:
+    """Times every call made directly from the routine's own code (one step per statement)."""
+
+    def __init__(self, code):
+        self.code = code
+        self.open = {}
+        self.steps = []
+
+    def __call__(self, frame, event, arg):
+        if event == "call" and frame.f_back is not None and frame.f_back.f_code is self.code:
+            self.open[id(frame)] = (frame.f_back.f_lineno, vex.world.now)
+        elif event == "return" and id(frame) in self.open:
+            line, start = self.open.pop(id(frame))
+            self.steps.append((line, start, vex.world.now))
+
+
+def runRoutine(name: str, model: DrivetrainModel = None, sdDirectory: str = None) -> dict:
+    """Run one routine in a fresh simulation and return its timing and pose."""
+    module = loadMain(model, sdDirectory)
+    label, routine = resolveRoutine(module, name)
+    isRoutine = isinstance(routine, module.autonRoutine)
+    profiler = None if isRoutine else stepProfiler(routine.__code__)
+    error = None
+    start = vex.world.now
+    wallStart = time.perf_counter()
+    if profiler:
+        sys.setprofile(profiler)
+    try:
+        routine()
+    except Exception as e:       # report the failing step instead of stopping the benchmark
+        error = "%s: %s" % (type(e).__name__, e)
+    finally:
+        sys.setprofile(None)
+    steps = []
+    if isRoutine:
+        for i in range(routine.completed):
+            steps.append({"line": i + 1, "step": routine.steps[i].name, "start": routine.starts[i], "duration": routine.actual[i], "planned": routine.planned[i]})
+    else:
+        for line, stepStart, stepEnd in sorted(profiler.steps, key=lambda s: s[1]):
+            source = linecache.getline(routine.__code__.co_filename, line).split("#")[0].strip()
+            steps.append({"line": line, "step": source, "start": (stepStart - start) / 1000, "duration": (stepEnd - stepStart) / 1000, "planned": None})
+    return {
+        "routine": label,
+        "duration": (vex.world.now - start) / 1000,
+        "wallTime": time.perf_counter() - wallStart,
+        "steps": steps,
+        "pose": vex.world.drivetrain.pose(),
+        "odometry": module.odometry.pose(),
+        "error": error,
+        "module": module,
+    }
+
+
+def printResult(result: dict):
+    print("%s: %.2f s simulated (%.2f s wall)" % (result["routine"], result["duration"], result["wallTime"]))
+    print("  line   start  planned    time  step")
+    for step in result["steps"]:
+        planned = "%8.2f" % step["planned"] if step["planned"] is not None else "       -"
+        print("  %4d %7.2f %s %7.2f  %s" % (step["line"], step["start"], planned, step["duration"], step["step"]))
+    x, y, heading = result["pose"]
+    ox, oy, oheading = result["odometry"]
+    print("  final pose:    x=%8.1f mm  y=%8.1f mm  heading=%7.1f deg" % (x, y, heading))
+    print("  odometry pose: x=%8.1f mm  y=%8.1f mm  heading=%7.1f deg" % (ox, oy, oheading))
+    if result["error"]:
+        print("  FAILED: %s" % result["error"])
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run autonomous routines from src/main.py in simulation.")
+    parser.add_argument("routines", nargs="*", default=DEFAULT_ROUTINES, help="routine names or turn:<angle>")
+    parser.add_argument("--csv", help="write every step of every routine to this CSV file")
+    parser.add_argument("--sd", help="directory to write simulated SD card files to")
+    parser.add_argument("--plant", help="JSON turn plant (from src/sysid.py) to build the drivetrain model from")
+    parser.add_argument("--check", action="store_true", help="validate every step-list routine instead of running")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return 0 if loadMain().checkRoutines() else 1
+
+    results = []
+    for name in args.routines:
+        model = DrivetrainModel.fromTurnPlant(TurnPlant.fromFile(args.plant)) if args.plant else None
+        results.append(runRoutine(name, model, args.sd))
+    for result in results:
+        printResult(result)
+
+    print("routine          simulated (s)  status")
+    for result in results:
+        print("%-16s %13.2f  %s" % (result["routine"], result["duration"], "FAILED" if result["error"] else "ok"))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["routine", "line", "step", "start", "planned", "duration"])
+            for result in results:
+                for step in result["steps"]:
+                    planned = "%.3f" % step["planned"] if step["planned"] is not None else ""
+                    writer.writerow([result["routine"], step["line"], step["step"], "%.3f" % step["start"], planned, "%.3f" % step["duration"]])
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
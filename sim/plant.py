@@ -0,0 +1,130 @@
+"""
+Physics models used by the simulated vex module.
+
+DrivetrainModel is a tank drivetrain where each side follows its commanded
+wheel speed as a first-order system with dead time and saturation:
+
+    v' = (gain * clamp(cmd(t - deadTime)) - v) / timeConstant
+
+The sides drive the robot pose (x along the starting direction, y to the
+right, heading clockwise in degrees, the same frame as poseEstimator in
+main.py).
+
+TurnPlant is the same drivetrain seen from the turn controller: turnPID
+output (%) in, heading rate (deg/s) out. It is what sysid.py fits from the
+turnPID logs, and DrivetrainModel.fromTurnPlant() turns it back into a
+drivetrain for the simulator.
+"""
+
+import json
+import math
+from collections import deque
+
+
+class TurnPlant:
+    """First-order turn plant: output (%) -> heading rate (deg/s).
+
+    Parameters:
+        gain: steady-state heading rate per % of turn output (deg/s per %)
+        timeConstant: first-order time constant (s)
+        deadTime: delay between a command and the first response (s)
+        saturation: largest output (%) that still has an effect
+    """
+
+    def __init__(self, gain: float = 10.0, timeConstant: float = 0.08, deadTime: float = 0.02, saturation: float = 100):
+        self.gain = gain
+        self.timeConstant = timeConstant
+        self.deadTime = deadTime
+        self.saturation = saturation
+
+    @classmethod
+    def fromFile(cls, path: str):
+        """Load a plant from a JSON file such as the one src/sysid.py writes."""
+        with open(path) as f:
+            values = json.load(f)
+        return cls(values["gain"], values["timeConstant"], values["deadTime"], values.get("saturation", 100))
+
+    def asDict(self) -> dict:
+        return {"gain": self.gain, "timeConstant": self.timeConstant, "deadTime": self.deadTime, "saturation": self.saturation}
+
+    def __repr__(self):
+        return "TurnPlant(gain=%.3f, timeConstant=%.3f, deadTime=%.3f, saturation=%.1f)" % (self.gain, self.timeConstant, self.deadTime, self.saturation)
+
+
+class DrivetrainModel:
+    """Tank drivetrain with a first-order, dead-time response per side.
+
+    Parameters:
+        maxRpm: wheel speed at 100% (600 for 6:1 direct drive)
+        wheelDiameter: drive wheel diameter (mm)
+        trackWidth: distance between the left and right wheels (mm)
+        timeConstant: first-order time constant of each side (s)
+        deadTime: command delay (s)
+        gain: fraction of the commanded speed reached in steady state
+        saturation: commands are clamped to -saturation..saturation (% of maxRpm)
+    """
+
+    def __init__(self, maxRpm: float = 600, wheelDiameter: float = 82.55, trackWidth: float = 300, timeConstant: float = 0.08, deadTime: float = 0.02, gain: float = 1.0, saturation: float = 100):
+        self.maxRpm = maxRpm
+        self.wheelDiameter = wheelDiameter
+        self.trackWidth = trackWidth
+        self.timeConstant = timeConstant
+        self.deadTime = deadTime
+        self.gain = gain
+        self.saturation = saturation
+        self.reset()
+
+    @classmethod
+    def fromTurnPlant(cls, plant: TurnPlant, maxRpm: float = 600, wheelDiameter: float = 82.55, trackWidth: float = 300):
+        """Build a drivetrain whose turn response matches plant.
+
+        A turn output of u % spins the sides at +-u % of maxRpm, which turns
+        the robot at 2 * v / trackWidth, so the side gain follows from the
+        fitted heading-rate gain.
+        """
+        mmPerSecondPerPercent = maxRpm / 100 / 60 * math.pi * wheelDiameter
+        degPerSecondPerPercent = math.degrees(2 * mmPerSecondPerPercent / trackWidth)
+        return cls(maxRpm, wheelDiameter, trackWidth, plant.timeConstant, plant.deadTime, plant.gain / degPerSecondPerPercent, plant.saturation)
+
+    def turnPlant(self) -> TurnPlant:
+        """Return the TurnPlant equivalent of this drivetrain."""
+        mmPerSecondPerPercent = self.maxRpm / 100 / 60 * math.pi * self.wheelDiameter
+        gain = self.gain * math.degrees(2 * mmPerSecondPerPercent / self.trackWidth)
+        return TurnPlant(gain, self.timeConstant, self.deadTime, self.saturation)
+
+    def reset(self, x: float = 0, y: float = 0, heading: float = 0):
+        self.x = x
+        self.y = y
+        self.heading = heading          # degrees, clockwise, not wrapped
+        self.leftRpm = 0.0
+        self.rightRpm = 0.0
+        self.delayed = deque()          # (release time, left cmd, right cmd)
+        self.command = (0.0, 0.0)
+        self.time = 0.0
+
+    def step(self, dt: float, leftCommand: float, rightCommand: float):
+        """Advance dt seconds with the given side commands (rpm)."""
+        self.time += dt
+        self.delayed.append((self.time + self.deadTime, leftCommand, rightCommand))
+        while self.delayed and self.delayed[0][0] <= self.time:
+            _, l, r = self.delayed.popleft()
+            self.command = (l, r)
+        limit = self.saturation / 100 * self.maxRpm
+        left = max(-limit, min(limit, self.command[0])) * self.gain
+        right = max(-limit, min(limit, self.command[1])) * self.gain
+        alpha = min(1.0, dt / self.timeConstant) if self.timeConstant > 0 else 1.0
+        self.leftRpm += (left - self.leftRpm) * alpha
+        self.rightRpm += (right - self.rightRpm) * alpha
+
+        mmPerRev = math.pi * self.wheelDiameter
+        leftSpeed = self.leftRpm / 60 * mmPerRev
+        rightSpeed = self.rightRpm / 60 * mmPerRev
+        speed = (leftSpeed + rightSpeed) / 2
+        turnRate = (leftSpeed - rightSpeed) / self.trackWidth   # rad/s, clockwise
+        middle = math.radians(self.heading) + turnRate * dt / 2
+        self.x += speed * math.cos(middle) * dt
+        self.y += speed * math.sin(middle) * dt
+        self.heading += math.degrees(turnRate * dt)
+
+    def pose(self) -> tuple:
+        return (self.x, self.y, self.heading)
@@ -0,0 +1,178 @@
+"""
+Batch PID gain sweep for the turn controller over a simulated plant.
+
+Every candidate (KP, KI, KD, speedCap) turns the simulated drivetrain from 0
+to each target angle with the pidController, settleDetector and angleError
+from src/main.py, the same code rotatePID runs on the robot (plain PID, the
+feedforward profile of rotatePID is not part of the sweep). Each turn is
+scored on settle time, overshoot and IAE (integral of |error|). The
+candidates are spread over all CPU cores with a process pool, and the
+Pareto-best ones (not beaten on all three scores by another candidate) are
+printed.
+
+usage:
+    python sim/sweep.py --kp 0.2:0.8:7 --ki 0:0.05:6 --kd 0:0.15:6 --speed-cap 20,40,60
+    python sim/sweep.py --random 2000 --plant plant.json --csv sweep.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+if SIM_DIR not in sys.path:
+    sys.path.insert(0, SIM_DIR)
+
+from plant import DrivetrainModel, TurnPlant      # noqa: E402
+
+DEFAULT_ANGLES = [30, 60, 90, 120, 150, 180, -30, -60, -90, -120, -150]
+
+_main = None
+
+
+def controllerCode():
+    """Return src/main.py loaded against the simulated vex module (once per process)."""
+    global _main
+    if _main is None:
+        import harness
+        _main = harness.loadMain()
+    return _main
+
+
+def simulateTurn(gains: tuple, plant: TurnPlant, angle: float, tollerance: float = 2, settleTime: float = 0.5, period: int = 50, timeout: float = 5) -> dict:
+    """Turn from 0 to angle with gains = (KP, KI, KD, speedCap) and score the response."""
+    main = controllerCode()
+    KP, KI, KD, speedCap = gains
+    model = DrivetrainModel.fromTurnPlant(plant)
+    controller = main.pidController(KP, KI, KD, speedCap, main.angleError)
+    settle = main.settleDetector(tollerance, settleTime, None, timeout)
+    controller.reset(angle, 0)
+    settle.reset(controller.error)
+    direction = 1 if controller.error >= 0 else -1
+    dt = period / 1000
+    rpmPerPercent = model.maxRpm / 100
+    overshoot = 0.0
+    iae = 0.0
+    elapsed = 0.0
+    while True:
+        heading = model.heading % 360
+        output = controller.step(heading, dt)
+        iae += abs(controller.error) * dt
+        overshoot = max(overshoot, -direction * controller.error)
+        if settle.update(controller.error, dt):
+            break
+        for _ in range(period):
+            model.step(0.001, output * rpmPerPercent, -output * rpmPerPercent)
+        elapsed += dt
+    return {"settleTime": elapsed if settle.settled else float("inf"), "overshoot": overshoot, "iae": iae, "settled": settle.settled}
+
+
+def evaluate(job: tuple) -> dict:
+    """Score one candidate over all angles (runs in a worker process)."""
+    gains, plantValues, angles, tollerance, settleTime = job
+    plant = TurnPlant(**plantValues)
+    turns = [simulateTurn(gains, plant, angle, tollerance, settleTime) for angle in angles]
+    return {
+        "KP": gains[0], "KI": gains[1], "KD": gains[2], "speedCap": gains[3],
+        "settleTime": sum(t["settleTime"] for t in turns) / len(turns),
+        "worstSettleTime": max(t["settleTime"] for t in turns),
+        "overshoot": max(t["overshoot"] for t in turns),
+        "iae": sum(t["iae"] for t in turns) / len(turns),
+        "failed": sum(not t["settled"] for t in turns),
+    }
+
+
+def paretoFront(results: list, keys=("settleTime", "overshoot", "iae")) -> list:
+    """Return the results no other result beats or equals on every key, sorted by settle time."""
+    front = []
+    for a in results:
+        dominated = False
+        for b in results:
+            if b is not a and all(b[k] <= a[k] for k in keys) and any(b[k] < a[k] for k in keys):
+                dominated = True
+                break
+        if not dominated:
+            front.append(a)
+    return sorted(front, key=lambda r: r[keys[0]])
+
+
+def parseRange(text: str) -> list:
+    """'a,b,c' -> [a, b, c]; 'start:stop:count' -> count evenly spaced values, both ends included."""
+    if ":" in text:
+        start, stop, count = text.split(":")
+        start, stop, count = float(start), float(stop), int(count)
+        if count == 1:
+            return [start]
+        return [start + (stop - start) * i / (count - 1) for i in range(count)]
+    return [float(v) for v in text.split(",")]
+
+
+def candidates(args) -> list:
+    if args.random:
+        rng = random.Random(args.seed)
+        bounds = [(min(v), max(v)) for v in (parseRange(args.kp), parseRange(args.ki), parseRange(args.kd), parseRange(args.speed_cap))]
+        return [tuple(rng.uniform(low, high) for low, high in bounds) for _ in range(args.random)]
+    return list(product(parseRange(args.kp), parseRange(args.ki), parseRange(args.kd), parseRange(args.speed_cap)))
+
+
+def loadPlant(args) -> TurnPlant:
+    if args.plant:
+        return TurnPlant.fromFile(args.plant)
+    return TurnPlant(args.gain, args.time_constant, args.dead_time, args.saturation)
+
+
+def sweep(gainList: list, plant: TurnPlant, angles=DEFAULT_ANGLES, tollerance: float = 2, settleTime: float = 0.5, workers=None) -> list:
+    """Evaluate every candidate in gainList in parallel and return all results."""
+    jobs = [(gains, plant.asDict(), angles, tollerance, settleTime) for gains in gainList]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate, jobs, chunksize=max(1, len(jobs) // (8 * (workers or os.cpu_count() or 1)))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep turn PID gains over a simulated plant.")
+    parser.add_argument("--kp", default="0.2:0.8:7", help="KP values, 'a,b,c' or 'start:stop:count'")
+    parser.add_argument("--ki", default="0:0.05:6")
+    parser.add_argument("--kd", default="0:0.15:6")
+    parser.add_argument("--speed-cap", default="20,40,60")
+    parser.add_argument("--random", type=int, default=0, help="draw this many random candidates inside the ranges instead of a grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plant", help="JSON file with gain, timeConstant, deadTime, saturation (e.g. from src/sysid.py)")
+    parser.add_argument("--gain", type=float, default=TurnPlant().gain, help="heading rate per %% output (deg/s per %%)")
+    parser.add_argument("--time-constant", type=float, default=TurnPlant().timeConstant)
+    parser.add_argument("--dead-time", type=float, default=TurnPlant().deadTime)
+    parser.add_argument("--saturation", type=float, default=TurnPlant().saturation)
+    parser.add_argument("--angles", default=",".join(str(a) for a in DEFAULT_ANGLES))
+    parser.add_argument("--tollerance", type=float, default=2)
+    parser.add_argument("--settle-time", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=15, help="number of Pareto-best candidates to print")
+    parser.add_argument("--csv", help="write every candidate's scores to this CSV file")
+    args = parser.parse_args(argv)
+
+    plant = loadPlant(args)
+    gainList = candidates(args)
+    angles = parseRange(args.angles)
+    print("%s, %d candidates x %d angles" % (plant, len(gainList), len(angles)))
+    results = sweep(gainList, plant, angles, args.tollerance, args.settle_time, args.workers)
+
+    front = paretoFront([r for r in results if not r["failed"]])
+    print("\nPareto-best gains (settle time, overshoot, IAE):")
+    print("     KP      KI      KD   cap   settle(s)  worst(s)  overshoot  IAE")
+    for r in front[:args.top]:
+        print("%7.3f %7.4f %7.4f %5.0f %11.2f %9.2f %10.2f %6.1f" % (r["KP"], r["KI"], r["KD"], r["speedCap"], r["settleTime"], r["worstSettleTime"], r["overshoot"], r["iae"]))
+    print("%d of %d candidates settled on every angle" % (sum(not r["failed"] for r in results), len(results)))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,744 @@
+"""
+Pure-Python stand-in for the VEX V5 `vex` module, for running main.py off-robot.
+
+Everything runs on a virtual clock. wait() does not sleep: the calling
+thread is parked, the clock jumps to the earliest wake-up time of all
+threads (stepping the physics in 1 ms increments on the way) and that
+thread continues. Only one thread runs at a time, so a 60 s routine takes
+well under a second and every run is deterministic.
+
+Only the parts of the API main.py uses are implemented. The drivetrain
+physics is attached by the harness with world.attachDrivetrain(), every
+other motor spins freely with a first-order response.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+
+
+# ---------------------------------------------------------------------------- #
+# enums and constants                                                          #
+# ---------------------------------------------------------------------------- #
+class _Enum:
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+
+    def __repr__(self):
+        return "%s.%s" % (self.kind, self.name)
+
+
+def _enum(kind, *names):
+    cls = type(kind, (), {})
+    for name in names:
+        setattr(cls, name, _Enum(kind, name))
+    return cls
+
+
+DirectionType = _enum("DirectionType", "FORWARD", "REVERSE")
+VelocityUnits = _enum("VelocityUnits", "PERCENT", "RPM", "DPS")
+RotationUnits = _enum("RotationUnits", "DEG", "REV", "RAW")
+TimeUnits = _enum("TimeUnits", "SECONDS", "MSEC")
+BrakeType = _enum("BrakeType", "COAST", "BRAKE", "HOLD")
+CurrentUnits = _enum("CurrentUnits", "AMP")
+VoltageUnits = _enum("VoltageUnits", "VOLT", "MV")
+PowerUnits = _enum("PowerUnits", "WATT")
+TorqueUnits = _enum("TorqueUnits", "NM", "INLB")
+TemperatureUnits = _enum("TemperatureUnits", "CELSIUS", "FAHRENHEIT")
+PercentUnits = _enum("PercentUnits", "PERCENT")
+FontType = _enum("FontType", "MONO12", "MONO15", "MONO20", "MONO30", "MONO40", "MONO60", "PROP20", "PROP30", "PROP40", "PROP60")
+
+FORWARD = DirectionType.FORWARD
+REVERSE = DirectionType.REVERSE
+PERCENT = PercentUnits.PERCENT
+RPM = VelocityUnits.RPM
+DPS = VelocityUnits.DPS
+DEGREES = RotationUnits.DEG
+TURNS = RotationUnits.REV
+SECONDS = TimeUnits.SECONDS
+MSEC = TimeUnits.MSEC
+COAST = BrakeType.COAST
+BRAKE = BrakeType.BRAKE
+HOLD = BrakeType.HOLD
+AMP = CurrentUnits.AMP
+VOLT = VoltageUnits.VOLT
+WATT = PowerUnits.WATT
+NM = TorqueUnits.NM
+
+
+class GearSetting:
+    RATIO_36_1 = _Enum("GearSetting", "RATIO_36_1")
+    RATIO_18_1 = _Enum("GearSetting", "RATIO_18_1")
+    RATIO_6_1 = _Enum("GearSetting", "RATIO_6_1")
+
+
+_MAX_RPM = {"RATIO_36_1": 100, "RATIO_18_1": 200, "RATIO_6_1": 600}
+
+
+class Ports:
+    pass
+
+
+for _i in range(1, 22):
+    setattr(Ports, "PORT%d" % _i, _i)
+
+
+class Color:
+    def __init__(self, value=0):
+        self.value = value
+
+    def __repr__(self):
+        return "Color(0x%06x)" % self.value
+
+
+for _name, _value in [("BLACK", 0x000000), ("WHITE", 0xFFFFFF), ("RED", 0xFF0000), ("GREEN", 0x00FF00), ("BLUE", 0x0000FF),
+                      ("YELLOW", 0xFFFF00), ("ORANGE", 0xFFA500), ("PURPLE", 0xFF00FF), ("CYAN", 0x00FFFF), ("TRANSPARENT", 0)]:
+    setattr(Color, _name, Color(_value))
+
+
+# ---------------------------------------------------------------------------- #
+# virtual clock and cooperative scheduler                                      #
+# ---------------------------------------------------------------------------- #
+class World:
+    """Virtual time, cooperative thread switching and physics for the simulation.
+
+    Attributes:
+        now: simulated time in ms
+        motors: every Motor created since the last reset()
+        drivetrain: physics model attached with attachDrivetrain() (or None)
+        physicsStep: physics integration step in ms
+    """
+
+    def __init__(self):
+        self.physicsStep = 1.0
+        self.reset()
+
+    def reset(self):
+        """Forget all devices and threads and restart the clock at 0."""
+        self.now = 0.0
+        self.sleepers = []
+        self.sequence = itertools.count()
+        self.motors = []
+        self.gyros = []
+        self.drivetrain = None
+        self.driveLeft = []
+        self.driveRight = []
+        self.switches = 0
+
+    # --- devices ---
+    def attachDrivetrain(self, leftGroup, rightGroup, gyro, model):
+        """Let model move leftGroup/rightGroup and the gyro.
+
+        model needs reset(), step(dt, leftRpm, rightRpm) and a heading
+        attribute, like plant.DrivetrainModel.
+        """
+        self.drivetrain = model
+        self.driveLeft = list(leftGroup.motors)
+        self.driveRight = list(rightGroup.motors)
+        for motor in self.driveLeft + self.driveRight:
+            motor.external = True
+        self.drivetrainGyro = gyro
+        gyro.model = model
+
+    # --- time ---
+    def advance(self, target: float):
+        """Move the clock to target ms, stepping the physics on the way."""
+        while self.now < target:
+            step = min(self.physicsStep, target - self.now)
+            self.stepPhysics(step / 1000)
+            self.now += step
+
+    def stepPhysics(self, dt: float):
+        if self.drivetrain is not None:
+            leftCommand = sum(m.commandRpm() for m in self.driveLeft) / max(1, len(self.driveLeft))
+            rightCommand = sum(m.commandRpm() for m in self.driveRight) / max(1, len(self.driveRight))
+            self.drivetrain.step(dt, leftCommand, rightCommand)
+            for motor in self.driveLeft:
+                motor.follow(self.drivetrain.leftRpm, dt)
+            for motor in self.driveRight:
+                motor.follow(self.drivetrain.rightRpm, dt)
+        for motor in self.motors:
+            if not motor.external:
+                motor.follow(None, dt)
+            motor.heat(dt)
+
+    def sleep(self, ms: float):
+        """Park the calling thread for ms of simulated time."""
+        event = threading.Event()
+        heapq.heappush(self.sleepers, (self.now + max(0.0, ms), next(self.sequence), event))
+        self.dispatch()
+        event.wait()
+
+    def dispatch(self):
+        """Wake the thread with the earliest wake-up time."""
+        if not self.sleepers:
+            return
+        wake, _, event = heapq.heappop(self.sleepers)
+        self.advance(wake)
+        self.switches += 1
+        event.set()
+
+    def spawn(self, callback, args=()):
+        """Start callback as a simulated thread; it first runs when the current thread waits."""
+        event = threading.Event()
+
+        def body():
+            event.wait()
+            try:
+                callback(*args)
+            finally:
+                self.dispatch()
+
+        thread = threading.Thread(target=body, daemon=True)
+        thread.start()
+        heapq.heappush(self.sleepers, (self.now, next(self.sequence), event))
+        return thread
+
+
+world = World()
+
+
+def wait(time, units=MSEC):
+    """Wait time (ms by default) of simulated time."""
+    world.sleep(time * 1000 if units is SECONDS else time)
+
+
+class Thread:
+    def __init__(self, callback, args=()):
+        self.thread = world.spawn(callback, args)
+
+    def stop(self):
+        pass
+
+
+class Event:
+    def __init__(self, callback=None, args=()):
+        self.callbacks = [(callback, args)] if callback else []
+
+    def __call__(self, callback, args=()):
+        self.callbacks.append((callback, args))
+
+    def broadcast(self):
+        for callback, args in self.callbacks:
+            world.spawn(callback, args)
+
+
+# ---------------------------------------------------------------------------- #
+# brain                                                                        #
+# ---------------------------------------------------------------------------- #
+class Timer:
+    def __init__(self):
+        self.offset = world.now
+
+    def time(self, units=MSEC):
+        elapsed = world.now - self.offset
+        return elapsed / 1000 if units is SECONDS else elapsed
+
+    def clear(self):
+        self.offset = world.now
+
+    reset = clear
+
+    def system(self):
+        return int(world.now)
+
+    def system_high_res(self):
+        return int(world.now * 1000)
+
+    def event(self, callback, delay, args=()):
+        def delayed():
+            wait(delay)
+            callback(*args)
+        world.spawn(delayed)
+
+
+class Screen:
+    """Brain screen: drawing calls are counted, touches can be injected with touch()."""
+
+    width = 480
+    height = 240
+
+    def __init__(self):
+        self.drawCalls = 0
+        self.renders = 0
+        self.text = []
+        self.touching = False
+        self.touchX = 0
+        self.touchY = 0
+        self.pressedCallbacks = []
+        self.releasedCallbacks = []
+
+    def _draw(self, *args, **kwargs):
+        self.drawCalls += 1
+
+    set_pen_color = set_fill_color = set_pen_width = set_font = set_cursor = set_origin = _draw
+    draw_rectangle = draw_line = draw_circle = draw_pixel = draw_image_from_file = _draw
+    clear_row = new_line = next_row = _draw
+
+    def clear_screen(self, color=None):
+        self.drawCalls += 1
+        self.text = []
+
+    def print(self, *args, **kwargs):
+        self.drawCalls += 1
+        self.text.append(" ".join(str(a) for a in args))
+
+    def print_at(self, *args, **kwargs):
+        self.drawCalls += 1
+        self.text.append(" ".join(str(a) for a in args))
+
+    def render(self):
+        self.renders += 1
+        return True
+
+    def pressing(self):
+        return self.touching
+
+    def x_position(self):
+        return self.touchX
+
+    def y_position(self):
+        return self.touchY
+
+    def pressed(self, callback, args=()):
+        self.pressedCallbacks.append((callback, args))
+
+    def released(self, callback, args=()):
+        self.releasedCallbacks.append((callback, args))
+
+    def touch(self, x: int, y: int, down: bool = True):
+        """Simulate a finger press (down=True) or release at x, y."""
+        self.touchX = x
+        self.touchY = y
+        self.touching = down
+        for callback, args in (self.pressedCallbacks if down else self.releasedCallbacks):
+            callback(*args)
+
+
+class SdCard:
+    """SD card kept in memory; also written to `directory` if it is set."""
+
+    def __init__(self):
+        self.files = {}
+        self.directory = None
+        self.writes = 0
+
+    def is_inserted(self):
+        return True
+
+    def _store(self, name, data, append):
+        data = bytes(data)
+        self.files[name] = (self.files.get(name, b"") if append else b"") + data
+        self.writes += 1
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "ab" if append else "wb") as f:
+                f.write(data)
+        return len(data)
+
+    def savefile(self, name, data):
+        return self._store(name, data, False)
+
+    def appendfile(self, name, data):
+        return self._store(name, data, True)
+
+    def loadfile(self, name):
+        return bytearray(self.files.get(name, b""))
+
+    def exists(self, name):
+        return name in self.files
+
+    def filesize(self, name):
+        return len(self.files.get(name, b""))
+
+
+class Battery:
+    def capacity(self, units=PERCENT):
+        return 100
+
+    def voltage(self, units=VOLT):
+        return 12.8
+
+    def current(self, units=AMP):
+        return sum(m.current() for m in world.motors)
+
+
+class _ThreeWirePort:
+    def __init__(self, name):
+        self.name = name
+
+
+class _ThreeWirePorts:
+    def __init__(self):
+        for name in "abcdefgh":
+            setattr(self, name, _ThreeWirePort(name))
+
+
+class Brain:
+    def __init__(self):
+        self.screen = Screen()
+        self.sdcard = SdCard()
+        self.timer = Timer()
+        self.battery = Battery()
+        self.three_wire_port = _ThreeWirePorts()
+
+    def program_stop(self):
+        raise SystemExit
+
+
+# ---------------------------------------------------------------------------- #
+# devices                                                                      #
+# ---------------------------------------------------------------------------- #
+def _toRpm(value, units, maxRpm):
+    if units is RPM:
+        return value
+    if units is DPS:
+        return value / 6
+    return value / 100 * maxRpm
+
+
+class Motor:
+    """Motor with a first-order speed response and a simple current/thermal model."""
+
+    def __init__(self, port, gears=GearSetting.RATIO_18_1, reverse=False):
+        if isinstance(gears, bool):
+            gears, reverse = GearSetting.RATIO_18_1, gears
+        self.port = port
+        self.reverse = reverse
+        self.maxRpm = _MAX_RPM[gears.name]
+        self.mode = "stop"          # "spin", "spin_for" or "stop"
+        self.direction = 1
+        self.velocityRpm = 0.5 * self.maxRpm   # set_velocity default is 50%
+        self.target = 0.0
+        self.rpm = 0.0
+        self.degrees = 0.0
+        self.brake = COAST
+        self.temperatureC = 25.0
+        self.amps = 0.0
+        self.maxTorqueFraction = 1.0
+        self.external = False       # True when the drivetrain model moves this motor
+        self.commands = 0
+        world.motors.append(self)
+
+    # --- commands ---
+    def spin(self, direction, velocity=None, units=PERCENT):
+        self.commands += 1
+        if velocity is not None:
+            self.velocityRpm = _toRpm(velocity, units, self.maxRpm)
+        self.direction = 1 if direction is FORWARD else -1
+        self.mode = "spin"
+
+    def spin_for(self, direction, value, units=DEGREES, velocity=None, units_v=PERCENT, wait=True):
+        self.commands += 1
+        if velocity is not None:
+            self.velocityRpm = _toRpm(velocity, units_v, self.maxRpm)
+        amount = value * 360 if units is TURNS else value
+        self.target = self.degrees + (amount if direction is FORWARD else -amount)
+        self.mode = "spin_for"
+        if wait:
+            while self.mode == "spin_for":
+                globals()["wait"](1)
+        return True
+
+    def spin_to_position(self, rotation, units=DEGREES, velocity=None, units_v=PERCENT, wait=True):
+        amount = rotation * 360 if units is TURNS else rotation
+        return self.spin_for(FORWARD, amount - self.degrees, DEGREES, velocity, units_v, wait)
+
+    def stop(self, mode=None):
+        self.commands += 1
+        if mode is not None:
+            self.brake = mode
+        self.mode = "stop"
+
+    def set_velocity(self, value, units=PERCENT):
+        self.commands += 1
+        self.velocityRpm = _toRpm(value, units, self.maxRpm)
+
+    def set_stopping(self, mode):
+        self.brake = mode
+
+    def set_max_torque(self, value, units=PERCENT):
+        self.maxTorqueFraction = value / 100
+
+    def set_position(self, value, units=DEGREES):
+        self.degrees = value * 360 if units is TURNS else value
+
+    def reset_position(self):
+        self.degrees = 0.0
+
+    # --- sensors ---
+    def position(self, units=DEGREES):
+        return self.degrees / 360 if units is TURNS else self.degrees
+
+    def velocity(self, units=RPM):
+        if units is PERCENT:
+            return self.rpm / self.maxRpm * 100
+        if units is DPS:
+            return self.rpm * 6
+        return self.rpm
+
+    def current(self, units=AMP):
+        return self.amps
+
+    def power(self, units=WATT):
+        return self.amps * 11 * min(1.0, abs(self.rpm) / self.maxRpm + 0.1)
+
+    def torque(self, units=NM):
+        return self.amps * 0.6 * (600 / self.maxRpm) / 6
+
+    def efficiency(self, units=PERCENT):
+        return 0 if self.amps < 0.05 else min(100.0, 100 * abs(self.rpm) / self.maxRpm)
+
+    def temperature(self, units=PERCENT):
+        return self.temperatureC
+
+    def is_spinning(self):
+        return abs(self.rpm) > 1
+
+    def is_done(self):
+        return self.mode != "spin_for"
+
+    def installed(self):
+        return True
+
+    # --- physics ---
+    def commandRpm(self) -> float:
+        """Speed this motor is being asked for, in rpm."""
+        if self.mode == "spin":
+            return self.direction * self.velocityRpm
+        if self.mode == "spin_for":
+            remaining = self.target - self.degrees
+            if abs(remaining) < 1:
+                self.mode = "stop"
+                return 0.0
+            return math.copysign(abs(self.velocityRpm), remaining)
+        return 0.0
+
+    def follow(self, rpm, dt: float):
+        """Update speed (rpm given by the drivetrain model, or own response) and position."""
+        command = self.commandRpm()
+        if rpm is None:
+            timeConstant = 0.3 if self.mode == "stop" and self.brake is COAST else 0.05
+            rpm = self.rpm + (command - self.rpm) * min(1.0, dt / timeConstant)
+        self.amps = min(2.5, 0.1 + 2.4 * min(1.0, abs(command - rpm) / (0.25 * self.maxRpm)) + 0.4 * abs(rpm) / self.maxRpm)
+        self.rpm = rpm
+        self.degrees += rpm * 6 * dt
+
+    def heat(self, dt: float):
+        self.temperatureC += (0.08 * self.amps * self.amps - 0.01 * (self.temperatureC - 25)) * dt
+
+
+class MotorGroup:
+    def __init__(self, *motors):
+        self.motors = list(motors)
+
+    def spin(self, direction, velocity=None, units=PERCENT):
+        for motor in self.motors:
+            motor.spin(direction, velocity, units)
+
+    def spin_for(self, direction, value, units=DEGREES, velocity=None, units_v=PERCENT, wait=True):
+        for motor in self.motors[1:]:
+            motor.spin_for(direction, value, units, velocity, units_v, False)
+        return self.motors[0].spin_for(direction, value, units, velocity, units_v, wait)
+
+    def stop(self, mode=None):
+        for motor in self.motors:
+            motor.stop(mode)
+
+    def set_velocity(self, value, units=PERCENT):
+        for motor in self.motors:
+            motor.set_velocity(value, units)
+
+    def set_stopping(self, mode):
+        for motor in self.motors:
+            motor.set_stopping(mode)
+
+    def set_max_torque(self, value, units=PERCENT):
+        for motor in self.motors:
+            motor.set_max_torque(value, units)
+
+    def set_position(self, value, units=DEGREES):
+        for motor in self.motors:
+            motor.set_position(value, units)
+
+    def reset_position(self):
+        for motor in self.motors:
+            motor.reset_position()
+
+    def position(self, units=DEGREES):
+        return self.motors[0].position(units)
+
+    def velocity(self, units=RPM):
+        return self.motors[0].velocity(units)
+
+    def current(self, units=AMP):
+        return sum(m.current() for m in self.motors)
+
+    def power(self, units=WATT):
+        return sum(m.power() for m in self.motors)
+
+    def torque(self, units=NM):
+        return sum(m.torque() for m in self.motors)
+
+    def efficiency(self, units=PERCENT):
+        return sum(m.efficiency() for m in self.motors) / len(self.motors)
+
+    def temperature(self, units=PERCENT):
+        return max(m.temperature() for m in self.motors)
+
+    def is_spinning(self):
+        return any(m.is_spinning() for m in self.motors)
+
+    def is_done(self):
+        return all(m.is_done() for m in self.motors)
+
+    def count(self):
+        return len(self.motors)
+
+
+class Inertial:
+    """Gyro: heading and rotation come from the attached drivetrain model (0 without one)."""
+
+    def __init__(self, port=None):
+        self.port = port
+        self.model = None
+        self.offset = 0.0
+        world.gyros.append(self)
+
+    def rotation(self, units=DEGREES):
+        return (self.model.heading if self.model else 0.0) + self.offset
+
+    def heading(self, units=DEGREES):
+        return self.rotation() % 360
+
+    def set_heading(self, value, units=DEGREES):
+        self.offset += value - self.heading()
+
+    def set_rotation(self, value, units=DEGREES):
+        self.offset += value - self.rotation()
+
+    def reset_heading(self):
+        self.set_heading(0)
+
+    def reset_rotation(self):
+        self.set_rotation(0)
+
+    def calibrate(self):
+        pass
+
+    def is_calibrating(self):
+        return False
+
+    def installed(self):
+        return True
+
+
+class Pneumatics:
+    def __init__(self, port=None):
+        self.port = port
+        self.state = 0
+
+    def open(self):
+        self.state = 1
+
+    def close(self):
+        self.state = 0
+
+    def value(self):
+        return self.state
+
+
+# ---------------------------------------------------------------------------- #
+# controller and competition                                                   #
+# ---------------------------------------------------------------------------- #
+class _Axis:
+    def __init__(self):
+        self.value = 0
+
+    def position(self, units=PERCENT):
+        return self.value
+
+    def changed(self, callback, args=()):
+        pass
+
+
+class _Button:
+    def __init__(self):
+        self.down = False
+        self.pressedCallbacks = []
+        self.releasedCallbacks = []
+
+    def pressing(self):
+        return self.down
+
+    def pressed(self, callback, args=()):
+        self.pressedCallbacks.append((callback, args))
+
+    def released(self, callback, args=()):
+        self.releasedCallbacks.append((callback, args))
+
+    def set(self, down: bool):
+        """Simulate pressing (True) or releasing (False) the button."""
+        if down != self.down:
+            self.down = down
+            for callback, args in (self.pressedCallbacks if down else self.releasedCallbacks):
+                callback(*args)
+
+
+class _ControllerScreen:
+    def __init__(self):
+        self.text = []
+        self.writes = 0
+
+    def print(self, *args, **kwargs):
+        self.writes += 1
+        self.text.append(" ".join(str(a) for a in args))
+
+    def clear_screen(self):
+        self.writes += 1
+        self.text = []
+
+    def set_cursor(self, row, column):
+        self.writes += 1
+
+    def clear_row(self, row=None):
+        self.writes += 1
+
+    def new_line(self):
+        self.writes += 1
+
+
+class Controller:
+    def __init__(self, *args):
+        for n in range(1, 5):
+            setattr(self, "axis%d" % n, _Axis())
+        for name in ["L1", "L2", "R1", "R2", "Up", "Down", "Left", "Right", "X", "B", "Y", "A"]:
+            setattr(self, "button" + name, _Button())
+        self.screen = _ControllerScreen()
+
+    def rumble(self, pattern):
+        pass
+
+
+class Competition:
+    def __init__(self, driver, autonomous):
+        self.driver = driver
+        self.autonomous = autonomous
+
+    def is_enabled(self):
+        return True
+
+    def is_driver_control(self):
+        return False
+
+    def is_autonomous(self):
+        return True
+
+    def is_competition_switch(self):
+        return False
+
+    def is_field_control(self):
+        return False
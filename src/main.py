@@ -11,17 +11,120 @@
 Main VEX V5 robot program for Team 49956A (Push Back 2025-2026).
 
 Contents:
+- motor command cache that drops repeated commands
 - device configuration
-- PID and turnPID classes for closed-loop control and tuning
+- fixed-rate loop timer and cooperative task executor
+- edge-triggered controller input layer
+- per-tick sensor snapshot
+- streaming SD card log writer and binary log format for tuning data
+- PID engine, settle detection, feedforward, gain schedules, output sinks and the PID/turnPID control loops
+- wheel odometry and IMU pose estimator
+- motor health monitor with thermal derating
+- profiled closed-loop straight drive
+- autonomous routine engine (validated step lists with a planned/actual timeline)
 - autonomous helper functions
-- autonomous code
+- autonomous routines (and the tuning and drivetrain characterization routines)
+- drive curve lookup tables, selectable from the controller
 - user-control helper functions
-- simple touchscreen autonomous selector UI
+- retained-mode touchscreen UI and autonomous selector
+- live dashboard on the brain and controller screens
 - competition instance creation
 """
 
 # Library imports
 from vex import *
+from array import array
+import math
+
+#-----------------------#
+# motor command caching #
+#-----------------------#
+class cachedMotor:
+    """Wraps a Motor or MotorGroup and drops commands identical to the last one.
+
+    spin(), stop() and set_velocity() remember what was last sent; sending
+    the same mode, direction, velocity or brake type again is suppressed
+    instead of going out to the device. Everything else (position(),
+    current(), ...) is passed straight to the wrapped device.
+    Commands that are not cached (spin_for, spin_to_position) and
+    invalidate() make the next command always go out.
+
+    Parameters:
+        device: the Motor or MotorGroup
+        name: label used in report()
+
+    Attributes:
+        issued, suppressed: commands sent to the device / dropped as duplicates
+    """
+
+    def __init__(self, device, name: str = ""):
+        self.device = device
+        self.name = name
+        self.issued = 0
+        self.suppressed = 0
+        self.invalidate()
+
+    def __getattr__(self, name):
+        return getattr(self.device, name)
+
+    def invalidate(self):
+        """Forget the cached state, so the next command is always sent."""
+        self.mode = None
+        self.direction = None
+        self.velocity = None
+        self.units = None
+        self.brake = None
+        self.setVelocity = None
+
+    def spin(self, direction, velocity = None, units = PERCENT):
+        if self.mode == "spin" and direction == self.direction and velocity == self.velocity and units == self.units:
+            self.suppressed += 1
+            return
+        self.device.spin(direction, velocity, units)
+        self.issued += 1
+        self.mode = "spin"
+        self.direction = direction
+        self.velocity = velocity
+        self.units = units
+
+    def stop(self, mode = None):
+        if self.mode == "stop" and mode == self.brake:
+            self.suppressed += 1
+            return
+        if mode is None:
+            self.device.stop()
+        else:
+            self.device.stop(mode)
+        self.issued += 1
+        self.mode = "stop"
+        self.brake = mode
+
+    def set_velocity(self, value, units = PERCENT):
+        if self.setVelocity == (value, units):
+            self.suppressed += 1
+            return
+        self.device.set_velocity(value, units)
+        self.issued += 1
+        self.setVelocity = (value, units)
+        # a running spin() without velocity now goes at the new speed, resend it next time
+        self.mode = None
+
+    def spin_for(self, *args, **kwargs):
+        self.invalidate()
+        self.issued += 1
+        return self.device.spin_for(*args, **kwargs)
+
+    def spin_to_position(self, *args, **kwargs):
+        self.invalidate()
+        self.issued += 1
+        return self.device.spin_to_position(*args, **kwargs)
+
+def motorCommandReport(motors: list) -> str:
+    """Return issued and suppressed command counts for a list of cachedMotors."""
+    lines = ["motor      issued  suppressed"]
+    for motor in motors:
+        lines.append("%-10s %6d %11d" % (motor.name, motor.issued, motor.suppressed))
+    return "\n".join(lines)
 
 #-------------------#
 # vex device config #
@@ -41,241 +144,1602 @@ right_2 = Motor(Ports.PORT9, GearSetting.RATIO_6_1, True)
 right_3 = Motor(Ports.PORT8, GearSetting.RATIO_6_1, False)
 right = MotorGroup(right_1, right_2, right_3)
 
-intakeMotor = Motor(Ports.PORT1, GearSetting.RATIO_18_1, True)
-storageMotor = Motor(Ports.PORT11, GearSetting.RATIO_18_1, True)
-outMotor = Motor(Ports.PORT16, True)
+# mechanism motors get the same command every tick, only changes go out
+intakeMotor = cachedMotor(Motor(Ports.PORT1, GearSetting.RATIO_18_1, True), "intake")
+storageMotor = cachedMotor(Motor(Ports.PORT11, GearSetting.RATIO_18_1, True), "storage")
+outMotor = cachedMotor(Motor(Ports.PORT16, True), "out")
+mechanismMotors = [intakeMotor, storageMotor, outMotor]
 
 loaderPiston = Pneumatics(brain.three_wire_port.a)
 descorePiston = Pneumatics(brain.three_wire_port.h)
 outPiston = Pneumatics(brain.three_wire_port.b)
 
+wheelDiameter = 82.55  # drive wheel diameter in mm
+
+#--------#
+# timing #
+#--------#
+class loopTimer:
+    """Fixed-rate scheduler for control loops.
+
+    Deadlines are absolute (start + n * period on brain.timer), so the time a
+    tick spends computing and reading sensors is taken out of the wait instead
+    of being added on top of the period. tick() sleeps until the next deadline
+    and returns the measured time since the previous tick, to be used as dt.
+
+    A tick that finishes after its deadline counts as an overrun; the schedule
+    then restarts from the current time instead of trying to catch up.
+
+    Parameters:
+        brain: Brain instance whose timer is used as the clock
+        period: loop period in ms
+
+    Attributes:
+        ticks: number of completed ticks since start()
+        overruns: number of ticks that missed their deadline
+        maxJitter: worst difference between a measured and the nominal period (ms)
+    """
+
+    def __init__(self, brain: Brain, period: int = 50):
+        self.brain = brain
+        self.period = period
+        self.start()
+
+    def start(self):
+        """(Re)start the schedule from the current time and reset the statistics."""
+        self.startTime = self.brain.timer.time(MSEC)
+        self.last = self.startTime
+        self.deadline = self.startTime + self.period
+        self.ticks = 0
+        self.overruns = 0
+        self.maxJitter = 0
+
+    def tick(self) -> float:
+        """Wait for the next deadline and return the measured dt in seconds."""
+        now = self.brain.timer.time(MSEC)
+        if now < self.deadline:
+            wait(self.deadline - now, MSEC)
+            self.deadline += self.period
+        else:
+            self.overruns += 1
+            self.deadline = now + self.period
+        now = self.brain.timer.time(MSEC)
+        dt = now - self.last
+        self.last = now
+        self.ticks += 1
+        if abs(dt - self.period) > self.maxJitter:
+            self.maxJitter = abs(dt - self.period)
+        return dt / 1000
+
+    def elapsed(self) -> float:
+        """Time between start() and the last tick in seconds."""
+        return (self.last - self.startTime) / 1000
+
+class scheduledTask:
+    """One job registered on a taskExecutor, run every `period` ms.
+
+    runs, cpuTime and maxTime (in us) are kept for taskExecutor.report().
+    """
+
+    def __init__(self, name: str, callback, period: int):
+        self.name = name
+        self.callback = callback
+        self.period = period
+        self.nextRun = 0
+        self.runs = 0
+        self.cpuTime = 0
+        self.maxTime = 0
+
+class taskExecutor:
+    """Cooperative executor that runs several subsystems from one loop.
+
+    Every tick it runs the tasks that are due, each at its own rate, and
+    measures the time each one takes. Callbacks must never block: a callback
+    that waits stalls every other subsystem.
+
+    Parameters:
+        brain: Brain instance (timer used for scheduling and CPU time)
+        period: base tick in ms, every task period should be a multiple of it
+
+    Button presses are not polled here: a controllerInput sampled by its own
+    task dispatches them as edges.
+
+    Usage:
+        driverInput = controllerInput(brain, controller_1)
+        driverInput.onPressed("B", toggleLoader)
+        executor = taskExecutor(brain, 10)
+        executor.addTask("input", driverInput.sample, 10)
+        executor.addTask("drive", driveFunction, 10)
+        executor.run()
+    """
+
+    def __init__(self, brain: Brain, period: int = 10):
+        self.brain = brain
+        self.timer = loopTimer(brain, period)
+        self.tasks = []
+        self.running = False
+
+    def addTask(self, name: str, callback, period: int) -> scheduledTask:
+        """Run callback every period ms."""
+        task = scheduledTask(name, callback, period)
+        self.tasks.append(task)
+        return task
+
+    def step(self):
+        """Run every task that is due at the current tick."""
+        now = self.timer.last
+        for task in self.tasks:
+            if now >= task.nextRun:
+                task.nextRun += task.period
+                if task.nextRun <= now:
+                    task.nextRun = now + task.period
+                startTime = self.brain.timer.system_high_res()
+                task.callback()
+                duration = self.brain.timer.system_high_res() - startTime
+                task.runs += 1
+                task.cpuTime += duration
+                if duration > task.maxTime:
+                    task.maxTime = duration
+
+    def run(self):
+        """Run the executor until stop() is called."""
+        self.running = True
+        self.timer.start()
+        for task in self.tasks:
+            task.nextRun = self.timer.last
+        while self.running:
+            self.step()
+            self.timer.tick()
+
+    def stop(self):
+        """Stop run() after the current tick."""
+        self.running = False
+
+    def report(self) -> str:
+        """Return per-task CPU usage: runs, average and worst time in us and share of the loop."""
+        total = self.timer.elapsed() * 1000000
+        lines = ["task      runs   avg(us)  max(us)  cpu%"]
+        for task in self.tasks:
+            average = task.cpuTime / task.runs if task.runs else 0
+            share = 100 * task.cpuTime / total if total else 0
+            lines.append("%-8s %6d %8d %8d %5.1f" % (task.name, task.runs, average, task.maxTime, share))
+        lines.append("overruns: %d  max jitter: %d ms" % (self.timer.overruns, self.timer.maxJitter))
+        return "\n".join(lines)
+
+#------------------#
+# controller input #
+#------------------#
+buttonNames = ["L1", "L2", "R1", "R2", "Up", "Down", "Left", "Right", "X", "B", "Y", "A"]
+
+class controllerInput:
+    """Samples all buttons and axes of a controller once per tick.
+
+    sample() reads every button into one bitmask and every axis into an array,
+    then computes the rising and falling edges against the previous snapshot
+    and calls the registered handlers. Everything else reads the snapshot
+    through pressing()/axis() instead of querying the controller again.
+
+    A button only changes state when its last change is at least `debounce`
+    ms ago, so contact bounce cannot fire a handler twice.
+
+    Parameters:
+        brain: Brain instance (timer used for debouncing)
+        controller: Controller to sample
+        debounce: debounce window in ms
+    """
+
+    def __init__(self, brain: Brain, controller: Controller, debounce: int = 30):
+        self.brain = brain
+        self.controller = controller
+        self.debounce = debounce
+        self.buttons = [getattr(controller, "button" + name) for name in buttonNames]
+        self.axisList = [controller.axis1, controller.axis2, controller.axis3, controller.axis4]
+        self.axes = array('b', [0, 0, 0, 0, 0])   # index 1-4 matches axis1-axis4
+        self.lastChange = array('l', [0] * len(buttonNames))
+        self.state = 0
+        self.rising = 0
+        self.falling = 0
+        self.pressHandlers = []
+        self.releaseHandlers = []
+
+    def mask(self, name: str) -> int:
+        """Return the bit of a button in the state/rising/falling masks."""
+        return 1 << buttonNames.index(name)
+
+    def onPressed(self, name: str, callback):
+        """Call callback once every time button `name` is pressed."""
+        self.pressHandlers.append((self.mask(name), callback))
+
+    def onReleased(self, name: str, callback):
+        """Call callback once every time button `name` is released."""
+        self.releaseHandlers.append((self.mask(name), callback))
+
+    def sample(self):
+        """Read the controller, update the edges and dispatch handlers."""
+        now = int(self.brain.timer.time(MSEC))
+        previous = self.state
+        state = previous
+        for i in range(len(self.buttons)):
+            bit = 1 << i
+            if (self.buttons[i].pressing() != 0) != ((previous & bit) != 0) and now - self.lastChange[i] >= self.debounce:
+                state ^= bit
+                self.lastChange[i] = now
+        for i in range(4):
+            self.axes[i + 1] = self.axisList[i].position()
+        self.state = state
+        self.rising = state & ~previous
+        self.falling = previous & ~state
+
+        if self.rising:
+            for bit, callback in self.pressHandlers:
+                if self.rising & bit:
+                    callback()
+        if self.falling:
+            for bit, callback in self.releaseHandlers:
+                if self.falling & bit:
+                    callback()
+
+    def pressing(self, name: str) -> bool:
+        """Return True if button `name` was held at the last sample."""
+        return (self.state & self.mask(name)) != 0
+
+    def axis(self, number: int) -> int:
+        """Return the position (-100..100) of axis1-axis4 at the last sample."""
+        return self.axes[number]
+
+#---------#
+# sensors #
+#---------#
+class sensorSnapshot:
+    """Per-tick cache of sensor readings.
+
+    update() reads every registered sensor exactly once and value() serves
+    that reading to every consumer until the next update(), so all the math
+    in one control tick works on the same measurement. The number of device
+    reads and their latency are counted per sensor.
+
+    Parameters:
+        brain: Brain instance (timer used to measure read latency)
+
+    Usage:
+        sensors = sensorSnapshot(brain)
+        sensors.add("heading", gyro.heading)
+        sensors.update()                # once per tick
+        heading = sensors.value("heading")
+    """
+
+    def __init__(self, brain: Brain):
+        self.brain = brain
+        self.names = []
+        self.readFunctions = []
+        self.index = {}
+        self.values = []
+        self.reads = array('l')
+        self.latency = array('l')     # total read time in us
+        self.maxLatency = array('l')  # worst single read in us
+
+    def add(self, name: str, readFunction):
+        """Register readFunction (e.g. gyro.heading) under name."""
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.readFunctions.append(readFunction)
+        self.values.append(0)
+        self.reads.append(0)
+        self.latency.append(0)
+        self.maxLatency.append(0)
+
+    def update(self):
+        """Read every sensor once."""
+        for i in range(len(self.readFunctions)):
+            startTime = self.brain.timer.system_high_res()
+            self.values[i] = self.readFunctions[i]()
+            duration = self.brain.timer.system_high_res() - startTime
+            self.reads[i] += 1
+            self.latency[i] += duration
+            if duration > self.maxLatency[i]:
+                self.maxLatency[i] = duration
+
+    def value(self, name: str):
+        """Return the reading of sensor name from the last update()."""
+        return self.values[self.index[name]]
+
+    def report(self) -> str:
+        """Return read count, average and worst read latency in us per sensor."""
+        lines = ["sensor    reads  avg(us)  max(us)"]
+        for i in range(len(self.names)):
+            average = self.latency[i] / self.reads[i] if self.reads[i] else 0
+            lines.append("%-8s %6d %8d %8d" % (self.names[i], self.reads[i], average, self.maxLatency[i]))
+        return "\n".join(lines)
+
+def angleError(desiredValue: float, heading: float) -> float:
+    """Return the shortest signed rotation (-180..180) from heading to desiredValue.
+
+    desiredValue does not have to be in 0..360, a profiled turn moves it past
+    the wrap.
+    """
+    error = desiredValue - heading
+    while error > 180:
+        error -= 360
+    while error < -180:
+        error += 360
+    return error
+
+#-----------#
+# telemetry #
+#-----------#
+def binaryHeader(channels: list) -> bytearray:
+    """Return the header of a binary telemetry file.
+
+    Layout (little endian):
+        4 bytes  magic b"VTLM"
+        1 byte   format version (1)
+        1 byte   number of channels
+        2 bytes  length of the channel name field
+        names    channel names joined by ",", padded with spaces to a multiple of 4
+
+    The header is followed by the rows, one float32 per channel, in the raw
+    byte order of array('f') on the brain (little endian). src/telemetry.py
+    reads these files on a computer.
+    """
+    names = ",".join(channels)
+    names += " " * (-(len(names) + 8) % 4)
+    header = bytearray(b"VTLM")
+    header.extend(bytes([1, len(channels), len(names) & 0xFF, len(names) >> 8]))
+    header.extend(names.encode())
+    return header
+
+class sdLogWriter:
+    """Streams control loop rows to a CSV file on the SD card while the loop runs.
+
+    Rows are written into a small ring of fixed-size chunks. Once a chunk is
+    full it is handed to a background Thread that formats it and appends it
+    to the file with appendfile, so the control thread never waits for the
+    SD card and memory use does not grow with the length of the run. Rows
+    that were flushed survive a brownout or a competition mode switch.
+
+    record() takes one value per channel, so a writer can be passed to
+    PID.run() as the recorder.
+
+    Parameters:
+        brain: the Brain (for the SD card and the timer)
+        sd_file_name: file to write (truncated on start)
+        channels: list of channel (column) names
+        chunkRows: rows per chunk
+        chunks: number of chunks; when all of them wait to be flushed, new rows are dropped
+        period: ms between checks for full chunks in the background thread
+        binary: write the binary format (see binaryHeader) instead of CSV;
+            chunks are then appended as raw bytes without any formatting
+
+    Attributes:
+        flushes: number of chunks written
+        lastFlush, maxFlush: time (us) the last and the slowest flush took
+        dropped: rows lost because every chunk was waiting to be flushed
+    """
+
+    def __init__(self, brain: Brain, sd_file_name: str, channels: list, chunkRows: int = 50, chunks: int = 4, period: int = 20, binary: bool = False):
+        self.brain = brain
+        self.sd_file_name = sd_file_name
+        self.channels = channels
+        self.width = len(channels)
+        self.chunkRows = chunkRows
+        self.chunks = chunks
+        self.period = period
+        self.binary = binary
+        self.data = array('f', (0.0 for _ in range(self.width * chunkRows * chunks)))
+        self.rows = array('l', (0 for _ in range(chunks)))
+        # chunk counters: filled is only written by the control thread, flushed only by the writer
+        self.filled = 0
+        self.flushed = 0
+        self.row = 0        # rows in the chunk being filled
+        self.dropped = 0
+        self.flushes = 0
+        self.lastFlush = 0
+        self.maxFlush = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Write the file header and start the background writer."""
+        self.filled = 0
+        self.flushed = 0
+        self.row = 0
+        self.dropped = 0
+        if self.binary:
+            header = binaryHeader(self.channels)
+        else:
+            header = bytearray(", ".join(self.channels) + "\n", 'utf-8')
+        self.brain.sdcard.savefile(self.sd_file_name, header)
+        if not self.running:
+            self.running = True
+            self.thread = Thread(self.loop)
+
+    def record(self, *values) -> bool:
+        """Write one row (one value per channel). Returns False if the row was dropped."""
+        if self.filled - self.flushed == self.chunks:
+            self.dropped += 1
+            return False
+        base = ((self.filled % self.chunks) * self.chunkRows + self.row) * self.width
+        for j in range(self.width):
+            self.data[base + j] = values[j]
+        self.row += 1
+        if self.row == self.chunkRows:
+            self.handOver()
+        return True
+
+    def handOver(self):
+        """Pass the chunk being filled to the writer."""
+        self.rows[self.filled % self.chunks] = self.row
+        self.row = 0
+        self.filled += 1
+
+    def flush(self):
+        """Format the oldest full chunk and append it to the file."""
+        start = self.brain.timer.system_high_res()
+        chunk = self.flushed % self.chunks
+        if self.binary:
+            base = chunk * self.chunkRows * self.width
+            buffer = bytearray(memoryview(self.data)[base:base + self.rows[chunk] * self.width])
+        else:
+            buffer = self.formatChunk(chunk)
+        self.brain.sdcard.appendfile(self.sd_file_name, buffer)
+        self.flushed += 1
+        self.flushes += 1
+        self.lastFlush = self.brain.timer.system_high_res() - start
+        if self.lastFlush > self.maxFlush:
+            self.maxFlush = self.lastFlush
+
+    def formatChunk(self, chunk: int) -> bytearray:
+        buffer = bytearray()
+        for n in range(self.rows[chunk]):
+            base = (chunk * self.chunkRows + n) * self.width
+            line = ",".join(["%.3f" % self.data[base + j] for j in range(self.width)])
+            buffer.extend((line + "\n").encode())
+        return buffer
+
+    def loop(self):
+        while self.running or self.flushed < self.filled:
+            if self.flushed < self.filled:
+                self.flush()
+            else:
+                wait(self.period, MSEC)
+
+    def close(self):
+        """Hand over the last partial chunk and wait until everything is on the SD card."""
+        if self.row and self.filled - self.flushed < self.chunks:
+            self.handOver()
+        self.running = False
+        while self.flushed < self.filled:
+            wait(self.period, MSEC)
+
 #-------------#
 # PID classes #
 #-------------#
+class pidController:
+    """PID math for one control loop, shared by every controller in this file.
+
+    step() is the only hot path: it takes one measurement and the measured dt
+    and returns the new output. The individual terms are kept as attributes
+    so recorders can log them without recomputing anything.
+
+    Parameters:
+        KP, KI, KD: PID gains
+        outputCap: limit the output to -outputCap..outputCap (None = no limit)
+        errorFunction: error(setpoint, measurement), e.g. angleError for headings
+    """
+
+    def __init__(self, KP: float = 1, KI: float = 0, KD: float = 0, outputCap = None, errorFunction = None):
+        self.KP = KP
+        self.KI = KI
+        self.KD = KD
+        self.outputCap = outputCap
+        self.errorFunction = errorFunction if errorFunction else linearError
+        self.setpoint = 0
+        self.reset(0, 0)
+
+    def reset(self, setpoint: float, measurement: float):
+        """Start controlling towards setpoint from the current measurement."""
+        self.setpoint = setpoint
+        self.error = self.errorFunction(setpoint, measurement)
+        self.previousError = self.error
+        self.totalError = 0.0        # integral of the error over time
+        self.proportional = 0.0
+        self.integral = 0.0
+        self.derivative = 0.0
+        self.output = 0.0
+
+    def step(self, measurement: float, dt: float) -> float:
+        """Compute and return the output for one control tick."""
+        self.error = self.errorFunction(self.setpoint, measurement)
+        self.totalError += self.error * dt
+        self.proportional = self.error * self.KP
+        self.integral = self.totalError * self.KI
+        self.derivative = (self.error - self.previousError) / dt * self.KD
+        self.previousError = self.error
+        output = self.proportional + self.integral + self.derivative
+        if self.outputCap is not None:
+            if output > self.outputCap:
+                output = self.outputCap
+            elif output < -self.outputCap:
+                output = -self.outputCap
+        self.output = output
+        return output
+
+class settleDetector:
+    """Decides when a controller has settled, in constant time per sample.
+
+    Instead of keeping a window of errors and scanning it for the maximum,
+    it keeps how long the error has been inside the band without a break:
+    "max |error| over the last settleTime <= band" is the same as "the error
+    stayed inside the band for settleTime". If the error is inside the band
+    from the very first sample, it is settled immediately.
+
+    Parameters:
+        errorBand: maximum |error| counted as on target
+        settleTime: time (s) the error has to stay inside the band
+        velocityBand: maximum |d error / dt| counted as on target (None = not checked)
+        timeout: give up after this many seconds (None = never)
+
+    Attributes:
+        settled: True once the settle criteria were met
+        timedOut: True if update() stopped because of the timeout
+    """
+
+    def __init__(self, errorBand: float, settleTime: float = 0, velocityBand = None, timeout = None):
+        self.errorBand = errorBand
+        self.settleTime = settleTime
+        self.velocityBand = velocityBand
+        self.timeout = timeout
+        self.reset(0)
+
+    def reset(self, error: float):
+        """Start a new move with the current error."""
+        self.previousError = error
+        self.elapsed = 0.0
+        self.inBandTime = 0.0
+        self.inBandSamples = 0
+        self.samples = 0
+        self.settled = False
+        self.timedOut = False
+
+    def update(self, error: float, dt: float) -> bool:
+        """Add one sample. Returns True when settled or timed out."""
+        self.elapsed += dt
+        inBand = abs(error) <= self.errorBand
+        if inBand and self.velocityBand is not None and dt > 0:
+            inBand = abs(error - self.previousError) / dt <= self.velocityBand
+        self.previousError = error
+        self.samples += 1
+        if inBand:
+            self.inBandSamples += 1
+            self.inBandTime += dt
+        else:
+            self.inBandSamples = 0
+            self.inBandTime = 0.0
+        # 1 ms slack so float rounding of the summed dt cannot add an extra tick
+        self.settled = inBand and (self.inBandSamples == self.samples or self.inBandTime >= self.settleTime - 0.001)
+        self.timedOut = not self.settled and self.timeout is not None and self.elapsed >= self.timeout
+        return self.settled or self.timedOut
+
+class feedforward:
+    """Output a mechanism needs to follow a planned velocity and acceleration.
+
+        output = kS * sign(velocity) + kV * velocity + kA * acceleration
+
+    kS is the output that just overcomes static friction, kV the output per
+    unit of velocity and kA the output per unit of acceleration. The gains
+    come from the characterize() routine, fitted with
+    `python src/sysid.py --feedforward`.
+
+    Parameters:
+        kS: static friction output (%)
+        kV: output per velocity (% per unit/s, e.g. % per deg/s for turns)
+        kA: output per acceleration (% per unit/s^2)
+    """
+
+    def __init__(self, kS: float = 0, kV: float = 0, kA: float = 0):
+        self.kS = kS
+        self.kV = kV
+        self.kA = kA
+
+    def calculate(self, velocity: float, acceleration: float = 0) -> float:
+        if velocity > 0:
+            static = self.kS
+        elif velocity < 0:
+            static = -self.kS
+        else:
+            static = 0
+        return static + self.kV * velocity + self.kA * acceleration
+
+    def maxVelocity(self, output: float) -> float:
+        """Return the velocity reached in steady state at output (%)."""
+        return (output - self.kS) / self.kV if self.kV else 0
+
+class gainSchedule:
+    """PID gains looked up by the size of the move.
+
+    Entries are (limit, KP, KI, KD): a move uses the first entry whose limit
+    is >= |move|, moves past the last limit use the last entry.
+
+    Usage:
+        rotatePID.schedule = gainSchedule([(45, 0.6, 0.02, 0.08), (360, 0.42, 0.02, 0.07)])
+    """
+
+    def __init__(self, entries: list):
+        self.entries = sorted(entries, key = lambda entry: entry[0])
+
+    def lookup(self, distance: float) -> tuple:
+        """Return (KP, KI, KD) for a move of distance."""
+        distance = abs(distance)
+        for entry in self.entries:
+            if distance <= entry[0]:
+                return entry[1], entry[2], entry[3]
+        entry = self.entries[-1]
+        return entry[1], entry[2], entry[3]
+
+    def apply(self, controller: pidController, distance: float):
+        controller.KP, controller.KI, controller.KD = self.lookup(distance)
+
+def linearError(desiredValue: float, measurement: float) -> float:
+    """Return the plain difference between desiredValue and measurement."""
+    return desiredValue - measurement
+
+# --------------------
+# PID output sinks
+# --------------------
+class nullSink:
+    """Output sink that does nothing, the caller reads PID.output itself."""
+
+    def start(self):
+        pass
+
+    def apply(self, output: float):
+        pass
+
+class motorSink:
+    """Spin a single Motor (or MotorGroup) at the PID output in percent."""
+
+    def __init__(self, motor):
+        self.motor = motor
+
+    def start(self):
+        self.motor.spin(FORWARD, 0)
+
+    def apply(self, output: float):
+        self.motor.set_velocity(output, PERCENT)
+
+class driveSink:
+    """Drive a drivetrain straight: both sides get the PID output in percent."""
+
+    def __init__(self, leftMotorGroup: MotorGroup, rightMotorGroup: MotorGroup):
+        self.left = leftMotorGroup
+        self.right = rightMotorGroup
+
+    def start(self):
+        self.right.spin(FORWARD, 0)
+        self.left.spin(FORWARD, 0)
+
+    def apply(self, output: float):
+        self.left.set_velocity(output, PERCENT)
+        self.right.set_velocity(output, PERCENT)
+
+class rotateSink(driveSink):
+    """Rotate a drivetrain on the spot: left gets +output, right gets -output."""
+
+    def apply(self, output: float):
+        self.left.set_velocity(output, PERCENT)
+        self.right.set_velocity(-output, PERCENT)
+
 class PID:
-    """Generic PID controller for reading a sensor and computing an output.
+    """Generic PID control loop: reads a sensor, runs pidController and applies the output.
+
+    run() is the only control loop. tune() is run() with an sdLogWriter
+    attached that streams every tick to the SD card, so tuning and
+    competition code share the same loop and timing.
 
     Attributes:
         yourSensor: callable returning current sensor value (e.g., gyro.heading)
         brain: Brain instance (used for SD card, screen, etc.)
         KP, KI, KD: PID constants
         output: last computed output value
-        stopButton: if True, tune() will show an on-screen stop button
+        sink: output sink the output is applied to (nullSink by default)
+        settleTime: default time (s) the error has to stay within tolerance
+        timer: loopTimer running the control loop every `period` ms
+        settle: settleDetector deciding when run() stops
+        feedforward: feedforward gains; with maxVelocity and acceleration set,
+            run() follows a trapezoidProfile and the PID only corrects the
+            difference to the planned position (None = plain PID)
+        maxVelocity, acceleration: profile limits (units/s, units/s^2)
+        schedule: gainSchedule picking KP, KI, KD per move (None = fixed gains)
     """
 
-    def __init__(self, yourSensor, brain: Brain, KP: float = 1, KI: float = 0, KD: float = 0):
-        self.KP = KP
-        self.KI = KI
-        self.KD = KD
+    channels = ["time", "proportional", "derivative", "integral", "output", "desiredValue", "measurement"]
+
+    def __init__(self, yourSensor, brain: Brain, KP: float = 1, KI: float = 0, KD: float = 0, period: int = 50, sink = None, speedCap = None, errorFunction = None, settleTime: float = 0, feedforward = None, maxVelocity = None, acceleration = None, schedule = None):
+        self.controller = pidController(KP, KI, KD, speedCap, errorFunction)
         self.yourSensor = yourSensor
         self.brain = brain
         self.output: float = 0
-
-    def run(self, desiredValue: int, tollerance: float):
-        """Run PID loop until the sensor reaches desiredValue within tolerance.
-
-        This method updates self.output. It does not apply the output to motors —
-        subclasses or callers should use self.output as required.
+        self.sink = sink if sink else nullSink()
+        self.settleTime = settleTime
+        self.timer = loopTimer(brain, period)
+        self.sensors = sensorSnapshot(brain)
+        self.sensors.add("measurement", yourSensor)
+        self.settle = settleDetector(0, settleTime)
+        self.speedCap = speedCap
+        self.feedforward = feedforward
+        self.maxVelocity = maxVelocity
+        self.acceleration = acceleration
+        self.schedule = schedule
+
+    def profile(self, distance: float):
+        """Return the trapezoidProfile run() follows for a move of distance, None without feedforward."""
+        if self.feedforward is None or not self.maxVelocity or not self.acceleration:
+            return None
+        return trapezoidProfile(distance, self.maxVelocity, self.acceleration)
+
+    def useFeedforward(self, feedforward, maxVelocity: float, acceleration: float, speedCap = None):
+        """Opt in to profiled moves with feedforward, optionally with a new speedCap.
+
+        feedforward None goes back to plain PID (the speedCap is left as is).
         """
-        previousError = 0
-        totalError = 0
-        i = 0
-        while abs(desiredValue - self.yourSensor()) > tollerance:
-            i += 1
-            error = desiredValue - self.yourSensor()
-            derivative = (error - previousError) / (i*50)
-            totalError += error
-            self.output = error * self.KP + derivative * self.KD + (totalError * (i*50)) * self.KI
-            wait(50)
-            previousError = error
-
-    def tune(self, desiredValue: int, tollerance: float, sd_file_name = "pidData.csv", stopButton = False):
-        """Run PID loop and save tuning data to SD card.
-
-        Produces CSV with columns:
-            time, error, derivative, totalError, output, desiredValue
-
-        If stopButton is True, displays a red 'terminate' button on the brain screen
-        allowing the operator to abort and save partial data.
+        self.feedforward = feedforward
+        self.maxVelocity = maxVelocity
+        self.acceleration = acceleration
+        if speedCap is not None:
+            self.speedCap = speedCap
+            self.controller.outputCap = speedCap
+
+    @property
+    def KP(self):
+        return self.controller.KP
+
+    @KP.setter
+    def KP(self, value):
+        self.controller.KP = value
+
+    @property
+    def KI(self):
+        return self.controller.KI
+
+    @KI.setter
+    def KI(self, value):
+        self.controller.KI = value
+
+    @property
+    def KD(self):
+        return self.controller.KD
+
+    @KD.setter
+    def KD(self, value):
+        self.controller.KD = value
+
+    def run(self, desiredValue: float, tollerance: float, settleTime = None, recorder = None, stopButton = False, velocityBand = None, timeout = None):
+        """Run the PID loop until the error stayed within tollerance for settleTime seconds.
+
+        The output is applied to the sink every tick and stored in self.output.
+        With a feedforward the setpoint follows profile() towards desiredValue
+        and the planned velocity and acceleration are fed forward; once the
+        profile is done kS is added towards the remaining error so static
+        friction cannot stall the last degrees. The settle check is always on
+        the error to desiredValue.
+        velocityBand and timeout are passed on to the settleDetector.
+        If a recorder is given, one row of self.channels is recorded per tick.
+        If stopButton is True, a red 'terminate' button on the brain screen
+        aborts the loop.
         """
         if stopButton:
             stop = button(60, 220, 250, 10, Color.RED, "terminate")
             stop.draw()
+            self.brain.screen.render()
+
+        settle = self.settle
+        settle.errorBand = tollerance
+        settle.settleTime = self.settleTime if settleTime is None else settleTime
+        settle.velocityBand = velocityBand
+        settle.timeout = timeout
+
+        controller = self.controller
+        self.sink.start()
+        self.sensors.update()
+        measurement = self.sensors.value("measurement")
+        controller.reset(desiredValue, measurement)
+        distance = controller.error
+        if self.schedule is not None:
+            self.schedule.apply(controller, distance)
+        settle.reset(distance)
+        profile = self.profile(distance)
+        feedforward = self.feedforward
+        cap = self.speedCap
+        origin = desiredValue - distance
+        velocity = 0.0
+        self.timer.start()
+        dt = self.timer.period / 1000
+
+        while True:
+            if profile is None:
+                self.output = controller.step(measurement, dt)
+                error = controller.error
+            else:
+                controller.setpoint = origin + profile.sample(self.timer.elapsed())
+                acceleration = (profile.velocity - velocity) / dt
+                velocity = profile.velocity
+                output = controller.step(measurement, dt)
+                error = controller.errorFunction(desiredValue, measurement)
+                if velocity != 0:
+                    output += feedforward.calculate(velocity, acceleration)
+                elif error > tollerance:
+                    output += feedforward.kS
+                elif error < -tollerance:
+                    output -= feedforward.kS
+                if cap is not None:
+                    if output > cap:
+                        output = cap
+                    elif output < -cap:
+                        output = -cap
+                self.output = output
+            if settle.update(error, dt):
+                break
+            self.sink.apply(self.output)
+            if recorder is not None:
+                recorder.record(self.timer.elapsed(), controller.proportional, controller.derivative, controller.integral, self.output, desiredValue, measurement)
 
-        csvHeaderText = "time, error, derivative, totalError, output, desiredValue"
-        data_buffer = csvHeaderText + "\n"
-
-        previousError = 0
-        totalError = 0
-        i = 0
-
-        while abs(desiredValue - self.yourSensor()) > tollerance:
-            i += 1
-            error = desiredValue - self.yourSensor()
-            derivative = (error - previousError) / (i*50)
-            totalError += error
-            self.output = error * self.KP + derivative * self.KD + (totalError * (i*50)) * self.KI
-            wait(50)
-            previousError = error
-
-            # append one row of data to buffer
-            data_buffer +=  str(i * 50) + ","
-            data_buffer += "%.3f" % error + ","
-            data_buffer += "%.3f" % derivative + ","
-            data_buffer += "%.3f" % (totalError * (i*50)) + ","
-            data_buffer += "%.3f" % self.output + ","
-            data_buffer += str(desiredValue) + "\n"
-            
             # allow user to abort when using touchscreen stop button
             if stopButton and stop.isPressed(self.brain.screen.x_position(),self.brain.screen.y_position()):
                 break
 
-        # save CSV to SD card (brain.sdcard)
-        self.brain.sdcard.savefile(sd_file_name, bytearray(data_buffer, 'utf-8'))
+            dt = self.timer.tick()
+            self.sensors.update()
+            measurement = self.sensors.value("measurement")
+
+    def tune(self, desiredValue: float, tollerance: float, settleTime = None, sd_file_name = "pidData.csv", stopButton = False, chunkRows: int = 50, binary: bool = False):
+        """Run the PID loop and stream tuning data to the SD card.
+
+        Produces CSV with the columns in self.channels, or the compact binary
+        format (see binaryHeader) if binary is True. The rows are written
+        while the loop runs by an sdLogWriter with chunks of chunkRows rows,
+        so an aborted run keeps everything up to the last flushed chunk.
+        If stopButton is True, displays a red 'terminate' button on the brain screen
+        allowing the operator to abort and save partial data.
+        """
+        writer = sdLogWriter(self.brain, sd_file_name, self.channels, chunkRows, binary = binary)
+        writer.start()
+        try:
+            self.run(desiredValue, tollerance, settleTime, writer, stopButton)
+        finally:
+            writer.close()
 
 class turnPID(PID):
     """PID controller specialized for turning a drivetrain (left/right motor groups).
 
     It computes a rotational output and sets velocities on left and right MotorGroups.
+    The error is wrapped with angleError so it always turns the short way.
 
     Constructor parameters:
         yourSensor: callable returning current heading/angle
         brain: Brain instance
         leftMotorGroup, rightMotorGroup: MotorGroup instances to apply rotation
+        speedCap: maximum rotation speed in percent
         KP, KI, KD: PID gains
-        stopButton: enable touchscreen terminate button during tune()
+        period: control loop period in ms
+        feedforward, maxVelocity, acceleration, schedule: see PID (deg/s, deg/s^2)
     """
 
-    def __init__(self, yourSensor, brain: Brain, leftMotorGroup: MotorGroup, rightMotorGroup: MotorGroup, speedCap: int = 100, KP: float = 1, KI: float = 0, KD: float = 0):
-        self.KP = KP
-        self.KI = KI
-        self.KD = KD
+    channels = ["time", "proportional", "derivative", "integral", "output", "desiredValue", "angle"]
+
+    def __init__(self, yourSensor, brain: Brain, leftMotorGroup: MotorGroup, rightMotorGroup: MotorGroup, speedCap: int = 100, KP: float = 1, KI: float = 0, KD: float = 0, period: int = 50, feedforward = None, maxVelocity = None, acceleration = None, schedule = None):
+        PID.__init__(self, yourSensor, brain, KP, KI, KD, period, rotateSink(leftMotorGroup, rightMotorGroup), speedCap, angleError, 0.5, feedforward, maxVelocity, acceleration, schedule)
         self.left = leftMotorGroup
         self.right = rightMotorGroup
-        self.yourSensor = yourSensor
-        self.brain = brain
-        self.output:float = 0
         self.speedCap:int = speedCap
 
-    def run (self, desiredValue: int, tollerance: float, settleTime: float = 0.5):
-        """Run turn PID and set motor velocities until target heading stabilised."""
 
-        self.right.spin(FORWARD, 0)
-        self.left.spin(FORWARD, 0)
+#----------#
+# odometry #
+#----------#
+class poseEstimator:
+    """Tracks the robot pose from the drive encoders and the gyro in a background thread.
 
-        totalError:float = 0.0
-        i = 0
-        if desiredValue - self.yourSensor() > 0:
-            if desiredValue - self.yourSensor() <= 180:
-                error:float = desiredValue - self.yourSensor()
-            elif desiredValue - self.yourSensor() > 180:
-                error:float = desiredValue - self.yourSensor() - 360
-        else:
-            if desiredValue - self.yourSensor() >= -180:
-                error:float = desiredValue - self.yourSensor()
-            elif desiredValue - self.yourSensor() < -180:
-                error:float = 360 + (desiredValue - self.yourSensor())
-
-        errorList = [error]
-        previousError:float = error
-
-        while abs(max(errorList, key=abs)) > tollerance:
-            i += 1
-            if desiredValue - self.yourSensor() > 0:
-                if desiredValue - self.yourSensor() <= 180:
-                    error:float = desiredValue - self.yourSensor()
-                elif desiredValue - self.yourSensor() > 180:
-                    error:float = desiredValue - self.yourSensor() - 360
+    Every `period` ms the distance driven since the last update is taken from
+    the average of the left and right MotorGroup positions and integrated
+    along the gyro heading (midpoint of the old and new heading).
+
+    The latest pose is published as a single tuple, so pose() from another
+    thread never sees a half-updated pose and needs no lock. Every update is
+    also stored in a fixed-size history ring.
+
+    Coordinates: x in mm along the starting direction, y in mm to the right,
+    heading in degrees clockwise like gyro.heading (not wrapped to 0-360).
+
+    Parameters:
+        brain: Brain instance
+        leftMotorGroup, rightMotorGroup: drive MotorGroups (position in degrees)
+        gyro: Inertial sensor
+        wheelDiameter: drive wheel diameter in mm
+        period: update period in ms
+        historySize: number of poses kept in the history ring
+    """
+
+    def __init__(self, brain: Brain, leftMotorGroup: MotorGroup, rightMotorGroup: MotorGroup, gyro: Inertial, wheelDiameter: float = 82.55, period: int = 10, historySize: int = 500):
+        self.brain = brain
+        self.left = leftMotorGroup
+        self.right = rightMotorGroup
+        self.gyro = gyro
+        self.mmPerDegree = wheelDiameter * math.pi / 360
+        self.timer = loopTimer(brain, period)
+        self.historySize = historySize
+        self.historyTime = array('l', [0] * historySize)
+        self.historyX = array('f', [0] * historySize)
+        self.historyY = array('f', [0] * historySize)
+        self.historyHeading = array('f', [0] * historySize)
+        self.historyHead = 0
+        self.historyCount = 0
+        self.running = False
+        self.reset()
+
+    def reset(self, x: float = 0, y: float = 0, heading = None):
+        """Set the current pose. heading None keeps the gyro heading."""
+        self.lastLeft = self.left.position(DEGREES)
+        self.lastRight = self.right.position(DEGREES)
+        self.lastRotation = self.gyro.rotation(DEGREES)
+        self.headingOffset = 0 if heading is None else heading - self.lastRotation
+        self.x = x
+        self.y = y
+        self.heading = self.lastRotation + self.headingOffset
+        self.latest = (x, y, self.heading)
+
+    def update(self):
+        """Integrate one odometry step and publish the new pose."""
+        leftPosition = self.left.position(DEGREES)
+        rightPosition = self.right.position(DEGREES)
+        rotation = self.gyro.rotation(DEGREES)
+        distance = ((leftPosition - self.lastLeft) + (rightPosition - self.lastRight)) / 2 * self.mmPerDegree
+        middle = math.radians((rotation + self.lastRotation) / 2 + self.headingOffset)
+        self.x += distance * math.cos(middle)
+        self.y += distance * math.sin(middle)
+        self.heading = rotation + self.headingOffset
+        self.lastLeft = leftPosition
+        self.lastRight = rightPosition
+        self.lastRotation = rotation
+        self.latest = (self.x, self.y, self.heading)
+
+        n = self.historyHead
+        self.historyTime[n] = int(self.timer.last)
+        self.historyX[n] = self.x
+        self.historyY[n] = self.y
+        self.historyHeading[n] = self.heading
+        self.historyHead = (n + 1) % self.historySize
+        if self.historyCount < self.historySize:
+            self.historyCount += 1
+
+    def pose(self) -> tuple:
+        """Return the latest (x, y, heading)."""
+        return self.latest
+
+    def history(self, n: int) -> tuple:
+        """Return (time in ms, x, y, heading) of the n-th most recent update (0 = latest)."""
+        if n >= self.historyCount:
+            raise IndexError("pose history only holds %d entries" % self.historyCount)
+        i = (self.historyHead - 1 - n) % self.historySize
+        return (self.historyTime[i], self.historyX[i], self.historyY[i], self.historyHeading[i])
+
+    def loop(self):
+        self.timer.start()
+        while self.running:
+            self.update()
+            self.timer.tick()
+
+    def start(self):
+        """Start updating in a background Thread."""
+        if not self.running:
+            self.running = True
+            self.thread = Thread(self.loop)
+
+    def stop(self):
+        """Stop the background thread after its current update."""
+        self.running = False
+
+#--------------#
+# motor health #
+#--------------#
+class motorHealthMonitor:
+    """Background monitor of motor temperature, current, power and efficiency.
+
+    Every `period` ms each registered motor is sampled into one array('h')
+    ring buffer (temperature in 0.1 C, current in 10 mA, power in 0.1 W,
+    efficiency in %), so a long skills run fits in a few kB.
+
+    Each group of motors gets an output scale from its hottest motor: 1.0
+    up to derateStart, dropping linearly to minScale at derateEnd. The
+    drive and intake code multiply their speeds by scale(group), so the
+    robot slows down a little before the motors' own thermal limit cuts
+    their current. Scale changes (in steps of 0.1) and motors drawing
+    more than currentLimit for `stallSamples` samples in a row are logged
+    as events, printed and appended to logFile on the SD card.
+
+    Parameters:
+        brain: Brain instance
+        period: ms between samples
+        capacity: samples kept per motor
+        derateStart, derateEnd: temperatures (C) where derating starts / reaches minScale
+        minScale: lowest output scale
+        currentLimit: current (A) counted as a stall or overload
+        logFile: SD card file for events, None to only keep them in memory
+
+    Usage:
+        motorHealth.addMotor("left_1", left_1, "drive")
+        motorHealth.start()
+        speed *= motorHealth.scale("drive")
+    """
+
+    fields = 4
+
+    def __init__(self, brain: Brain, period: int = 500, capacity: int = 240, derateStart: float = 50, derateEnd: float = 60, minScale: float = 0.5, currentLimit: float = 2.3, stallSamples: int = 4, logFile = None):
+        self.brain = brain
+        self.period = period
+        self.capacity = capacity
+        self.derateStart = derateStart
+        self.derateEnd = derateEnd
+        self.minScale = minScale
+        self.currentLimit = currentLimit
+        self.stallSamples = stallSamples
+        self.logFile = logFile
+        self.names = []
+        self.devices = []
+        self.groups = []
+        self.stallCount = []
+        self.scales = {}
+        self.data = None
+        self.head = 0
+        self.count = 0
+        self.events = []
+        self.maxEvents = 50
+        self.running = False
+        self.thread = None
+
+    def addMotor(self, name: str, device, group: str):
+        """Monitor a Motor (or cachedMotor) as part of group."""
+        self.names.append(name)
+        self.devices.append(device)
+        self.groups.append(group)
+        self.stallCount.append(0)
+        self.scales[group] = 1.0
+        self.data = array('h', [0] * (len(self.devices) * self.fields * self.capacity))
+        self.head = 0
+        self.count = 0
+
+    def scale(self, group: str) -> float:
+        """Output scale (minScale..1) for a group of motors."""
+        return self.scales.get(group, 1.0)
+
+    def log(self, text: str):
+        """Record an event with the time since program start."""
+        line = "%.1f,%s" % (self.brain.timer.time(SECONDS), text)
+        self.events.append(line)
+        if len(self.events) > self.maxEvents:
+            self.events.pop(0)
+        print(line)
+        if self.logFile is not None:
+            self.brain.sdcard.appendfile(self.logFile, bytearray(line + "\n", 'utf-8'))
+
+    def sample(self):
+        """Read every motor once, update the group scales and log events."""
+        hottest = {}
+        width = len(self.devices) * self.fields
+        base = self.head * width
+        for i in range(len(self.devices)):
+            device = self.devices[i]
+            temperature = device.temperature(TemperatureUnits.CELSIUS)
+            current = device.current(CurrentUnits.AMP)
+            j = base + i * self.fields
+            self.data[j] = int(temperature * 10)
+            self.data[j + 1] = int(current * 100)
+            self.data[j + 2] = int(device.power(PowerUnits.WATT) * 10)
+            self.data[j + 3] = int(device.efficiency(PERCENT))
+
+            group = self.groups[i]
+            if temperature > hottest.get(group, -100):
+                hottest[group] = temperature
+            if current > self.currentLimit:
+                self.stallCount[i] += 1
+                if self.stallCount[i] == self.stallSamples:
+                    self.log("%s,current,%.2f" % (self.names[i], current))
             else:
-                if desiredValue - self.yourSensor() >= -180:
-                    error:float = desiredValue - self.yourSensor()
-                elif desiredValue - self.yourSensor() < -180:
-                    error:float = 360 + (desiredValue - self.yourSensor())
-
-            derivative = (error - previousError) / 0.050
-            totalError += error
-            self.output = min(error * self.KP + derivative * self.KD + (totalError * 0.050) * self.KI, (self.speedCap if error * self.KP + derivative * self.KD + (totalError * 0.050) * self.KI > 0 else -self.speedCap), key=abs)
-            self.left.set_velocity(self.output, PERCENT)
-            self.right.set_velocity(-self.output, PERCENT)
-            wait(50)
-            previousError = error
-            errorList.append(error)
-            if len(errorList) > settleTime/0.050:
-                errorList.pop(0)
-
-    def tune(self, desiredValue: int, tollerance: float, settleTime: float = 0.5, sd_file_name = "pidData.csv", stopButton = False):
-        """Run tuning loop similar to PID.tune but saves a CSV containing PID data.
-
-        CSV columns:
-            time, proportional, derivative, integral, output
-        """
-        if stopButton:
-            stop = button(60, 220, 250, 10, Color.RED, "terminate")
-            stop.draw()
-            brain.screen.render()
+                self.stallCount[i] = 0
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        for group in hottest:
+            temperature = hottest[group]
+            if temperature <= self.derateStart:
+                scale = 1.0
+            elif temperature >= self.derateEnd:
+                scale = self.minScale
+            else:
+                scale = 1.0 - (temperature - self.derateStart) / (self.derateEnd - self.derateStart) * (1.0 - self.minScale)
+            scale = round(scale * 10) / 10
+            if scale != self.scales[group]:
+                self.log("%s,derate,%.1f,%.1fC" % (group, scale, temperature))
+                self.scales[group] = scale
+
+    def history(self, n: int, motor: int) -> tuple:
+        """Return (temperature C, current A, power W, efficiency %) of motor number `motor`, n samples ago (0 = latest)."""
+        if n >= self.count:
+            raise IndexError("motor history only holds %d samples" % self.count)
+        j = ((self.head - 1 - n) % self.capacity) * len(self.devices) * self.fields + motor * self.fields
+        return (self.data[j] / 10, self.data[j + 1] / 100, self.data[j + 2] / 10, self.data[j + 3])
+
+    def loop(self):
+        while self.running:
+            self.sample()
+            wait(self.period, MSEC)
+
+    def start(self):
+        """Start sampling in a background Thread."""
+        if not self.running:
+            self.running = True
+            self.thread = Thread(self.loop)
+
+    def stop(self):
+        self.running = False
+
+#---------------#
+# drive control #
+#---------------#
+class trapezoidProfile:
+    """Trapezoidal velocity profile for a move of `distance`.
+
+    Accelerates at `acceleration` up to `maxVelocity`, cruises and decelerates
+    so it stops exactly at `distance`. Short moves never reach maxVelocity
+    and become a triangle. Works for negative distances as well.
 
-        csvHeaderText:str = "time, proportional, derivative, integral, output, desiredValue, angle"
-        data_buffer:str = csvHeaderText + "\n"
-        self.right.spin(FORWARD, 0)
-        self.left.spin(FORWARD, 0)
+    Parameters:
+        distance: length of the move (mm)
+        maxVelocity: cruise velocity (mm/s), > 0
+        acceleration: acceleration and deceleration (mm/s^2), > 0
+    """
 
-        totalError:float = 0.0
-        i = 0
-        if desiredValue - self.yourSensor() > 0:
-            if desiredValue - self.yourSensor() <= 180:
-                error:float = desiredValue - self.yourSensor()
-            elif desiredValue - self.yourSensor() > 180:
-                error:float = desiredValue - self.yourSensor() - 360
+    def __init__(self, distance: float, maxVelocity: float, acceleration: float):
+        self.distance = distance
+        self.direction = 1 if distance >= 0 else -1
+        length = abs(distance)
+        # peak velocity, limited for moves too short to reach maxVelocity
+        self.peak = min(maxVelocity, math.sqrt(length * acceleration))
+        self.acceleration = acceleration
+        self.accelTime = self.peak / acceleration if acceleration else 0
+        accelDistance = self.peak * self.accelTime / 2
+        self.cruiseTime = (length - 2 * accelDistance) / self.peak if self.peak else 0
+        self.duration = 2 * self.accelTime + self.cruiseTime
+        self.velocity = 0.0
+
+    def sample(self, t: float) -> float:
+        """Return the planned position at time t (s) and set self.velocity."""
+        a = self.acceleration
+        if t <= 0:
+            self.velocity = 0.0
+            return 0.0
+        if t < self.accelTime:
+            velocity = a * t
+            position = a * t * t / 2
+        elif t < self.accelTime + self.cruiseTime:
+            velocity = self.peak
+            position = self.peak * self.accelTime / 2 + self.peak * (t - self.accelTime)
+        elif t < self.duration:
+            remaining = self.duration - t
+            velocity = a * remaining
+            position = abs(self.distance) - a * remaining * remaining / 2
         else:
-            if desiredValue - self.yourSensor() >= -180:
-                error:float = desiredValue - self.yourSensor()
-            elif desiredValue - self.yourSensor() < -180:
-                error:float = 360 + (desiredValue - self.yourSensor())
-
-        errorList = [error]
-        previousError:float = error
-
-        while abs(max(errorList, key=abs)) > tollerance:
-            i += 1
-            if desiredValue - self.yourSensor() > 0:
-                if desiredValue - self.yourSensor() <= 180:
-                    error:float = desiredValue - self.yourSensor()
-                elif desiredValue - self.yourSensor() > 180:
-                    error:float = desiredValue - self.yourSensor() - 360
-            else:
-                if desiredValue - self.yourSensor() >= -180:
-                    error:float = desiredValue - self.yourSensor()
-                elif desiredValue - self.yourSensor() < -180:
-                    error:float = 360 + (desiredValue - self.yourSensor())
-
-            derivative = (error - previousError) / 0.050
-            totalError += error
-            self.output = min(error * self.KP + derivative * self.KD + (totalError * 0.050) * self.KI, (self.speedCap if error * self.KP + derivative * self.KD + (totalError * 0.050) * self.KI > 0 else -self.speedCap), key=abs)
-            self.left.set_velocity(self.output, PERCENT)
-            self.right.set_velocity(-self.output, PERCENT)
-            wait(50)
-            previousError = error
-            errorList.append(error)
-            if len(errorList) > settleTime/0.050:
-                errorList.pop(0)
-
-            # save one row of data
-            data_buffer += str(i * 0.050) + ","
-            data_buffer += "%.3f" % (error*self.KP) + ","
-            data_buffer += "%.3f" % (derivative * self.KD)  + ","
-            data_buffer += "%.3f" % (totalError * 0.050 * self.KI) + ","
-            data_buffer += "%.3f" % self.output + ","
-            data_buffer += str(desiredValue) + ","
-            data_buffer += "%.3f" % self.yourSensor() + "\n"
+            velocity = 0.0
+            position = abs(self.distance)
+        self.velocity = velocity * self.direction
+        return position * self.direction
+
+class driveController:
+    """Closed-loop straight drive: follows a trapezoidal profile on distance and holds the heading.
+
+    The velocity planned `lead` seconds ahead is fed forward, so the
+    drivetrain's response lag does not leave it behind the profile at the
+    end of the move. The distance PID corrects the
+    difference between the planned and the measured position (average of both
+    encoder sides), and the heading PID keeps the gyro heading the move
+    started with. The move ends through a settleDetector on the distance
+    error once the profile is done, instead of a fixed spin_for.
 
-            if stopButton and stop.isPressed(self.brain.screen.x_position(),self.brain.screen.y_position()):
+    Parameters:
+        brain: Brain instance
+        leftMotorGroup, rightMotorGroup: drive MotorGroups
+        gyro: Inertial sensor
+        wheelDiameter: drive wheel diameter in mm
+        maxSpeed: drivetrain speed at 100% in mm/s (600 rpm direct drive)
+        acceleration: profile acceleration in mm/s^2
+        distancePID: pidController on the distance error (mm -> %)
+        headingPID: pidController on the heading error (degrees -> %)
+        period: control loop period in ms
+        lead: how far ahead (s) the fed forward velocity is sampled, about
+            the motors' response time
+    """
+
+    def __init__(self, brain: Brain, leftMotorGroup: MotorGroup, rightMotorGroup: MotorGroup, gyro: Inertial, wheelDiameter: float = 82.55, maxSpeed: float = 2590, acceleration: float = 2500, distancePID = None, headingPID = None, period: int = 10, lead: float = 0.1):
+        self.brain = brain
+        self.left = leftMotorGroup
+        self.right = rightMotorGroup
+        self.mmPerDegree = wheelDiameter * math.pi / 360
+        self.maxSpeed = maxSpeed
+        self.acceleration = acceleration
+        self.lead = lead
+        self.distancePID = distancePID if distancePID else pidController(0.3, 0, 0.01, 100)
+        self.headingPID = headingPID if headingPID else pidController(1.0, 0, 0.05, 30, angleError)
+        self.timer = loopTimer(brain, period)
+        self.sensors = sensorSnapshot(brain)
+        self.sensors.add("left", lambda: leftMotorGroup.position(DEGREES))
+        self.sensors.add("right", lambda: rightMotorGroup.position(DEGREES))
+        self.sensors.add("heading", gyro.heading)
+        self.settle = settleDetector(10, 0.05)
+        self.output = 0.0
+
+    def distance(self) -> float:
+        """Distance driven since the last reset, from the last sensor snapshot, in mm."""
+        return ((self.sensors.value("left") - self.startLeft) + (self.sensors.value("right") - self.startRight)) / 2 * self.mmPerDegree
+
+    def drive(self, mm: float, speed: float = 50, tollerance: float = 10, settleTime: float = 0.05, timeout = None):
+        """Drive mm (negative = backwards) at up to speed percent, then stop.
+
+        Returns when the distance error stayed within tollerance mm for
+        settleTime seconds after the profile finished, or after timeout
+        seconds (default: profile duration + 1 s).
+        """
+        profile = trapezoidProfile(mm, abs(speed) / 100 * self.maxSpeed, self.acceleration)
+        self.sensors.update()
+        self.startLeft = self.sensors.value("left")
+        self.startRight = self.sensors.value("right")
+        heading = self.sensors.value("heading")
+        self.distancePID.reset(0, 0)
+        self.headingPID.reset(heading, heading)
+        self.settle.errorBand = tollerance
+        self.settle.settleTime = settleTime
+        self.settle.timeout = None
+        self.settle.reset(mm)
+        if timeout is None:
+            timeout = profile.duration + 1
+
+        self.left.spin(FORWARD, 0, PERCENT)
+        self.right.spin(FORWARD, 0, PERCENT)
+        self.timer.start()
+        dt = self.timer.period / 1000
+        while True:
+            elapsed = self.timer.elapsed()
+            travelled = self.distance()
+            self.distancePID.setpoint = profile.sample(elapsed)
+            profile.sample(elapsed + self.lead)
+            forwardOutput = profile.velocity / self.maxSpeed * 100 + self.distancePID.step(travelled, dt)
+            turnOutput = self.headingPID.step(self.sensors.value("heading"), dt)
+            self.output = forwardOutput
+            self.left.set_velocity(forwardOutput + turnOutput, PERCENT)
+            self.right.set_velocity(forwardOutput - turnOutput, PERCENT)
+
+            if elapsed >= profile.duration and self.settle.update(mm - travelled, dt):
                 break
+            if elapsed >= timeout:
+                self.settle.timedOut = True
+                break
+            dt = self.timer.tick()
+            self.sensors.update()
+
+        self.left.stop()
+        self.right.stop()
+
+#---------------------------#
+# autonomous routine engine #
+#---------------------------#
+class autonStep:
+    """One step of an autonRoutine.
 
-        self.brain.sdcard.savefile(sd_file_name, bytearray(data_buffer, 'utf-8'))
+    Subclasses set self.name and implement run(). plan(heading) returns the
+    expected duration in seconds and the heading after the step (used to
+    estimate turns), validate() returns a list of problems with the step.
+    """
+
+    name = "step"
+
+    def plan(self, heading: float, routine) -> tuple:
+        return 0.0, heading
+
+    def validate(self) -> list:
+        return []
+
+    def run(self):
+        pass
+
+def isNumber(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class driveStep(autonStep):
+    """Drive mm straight (negative = backwards) at up to speed percent with driveStraight."""
+
+    def __init__(self, mm: float, speed: float = 20, timeout = None):
+        self.mm = mm
+        self.speed = speed
+        self.timeout = timeout
+        self.name = "drive %s mm @%s%%" % (mm, speed)
+
+    def plan(self, heading: float, routine) -> tuple:
+        profile = trapezoidProfile(self.mm, abs(self.speed) / 100 * driveStraight.maxSpeed, driveStraight.acceleration)
+        return profile.duration + 0.1, heading
+
+    def validate(self) -> list:
+        problems = []
+        if not isNumber(self.mm) or self.mm == 0:
+            problems.append("distance must be a non-zero number")
+        if not isNumber(self.speed) or not 0 < self.speed <= 100:
+            problems.append("speed must be in 0..100")
+        return problems
+
+    def run(self):
+        driveStraight.drive(self.mm, self.speed * motorHealth.scale("drive"), timeout = self.timeout)
+
+class turnStep(autonStep):
+    """Turn to an absolute heading with rotatePID."""
+
+    def __init__(self, angle: float, tollerance: float = 2, timeout = None):
+        self.angle = angle
+        self.tollerance = tollerance
+        self.timeout = timeout
+        self.name = "turn to %s deg" % angle
+
+    def plan(self, heading: float, routine) -> tuple:
+        distance = angleError(self.angle, heading)
+        profile = rotatePID.profile(distance)
+        turnTime = profile.duration if profile is not None else abs(distance) / routine.turnRate
+        return turnTime + rotatePID.settleTime, self.angle % 360
+
+    def validate(self) -> list:
+        problems = []
+        if not isNumber(self.angle) or not -360 <= self.angle <= 360:
+            problems.append("angle must be a number in -360..360")
+        if not isNumber(self.tollerance) or self.tollerance <= 0:
+            problems.append("tollerance must be > 0")
+        return problems
+
+    def run(self):
+        rotatePID.run(self.angle, self.tollerance, timeout = self.timeout)
+
+class spinStep(autonStep):
+    """Start a mechanism motor; velocity 0 stops it (brake)."""
+
+    def __init__(self, motor, direction, velocity: float, label: str = "motor"):
+        self.motor = motor
+        self.direction = direction
+        self.velocity = velocity
+        self.name = "spin %s %s%%" % (label, velocity)
+
+    def validate(self) -> list:
+        problems = []
+        if not hasattr(self.motor, "spin"):
+            problems.append("motor has no spin()")
+        if self.direction is not FORWARD and self.direction is not REVERSE:
+            problems.append("direction must be FORWARD or REVERSE")
+        if not isNumber(self.velocity) or not -100 <= self.velocity <= 100:
+            problems.append("velocity must be in -100..100")
+        return problems
+
+    def run(self):
+        if self.velocity == 0:
+            self.motor.stop(BRAKE)
+        else:
+            self.motor.spin(self.direction, self.velocity, PERCENT)
 
+class pistonStep(autonStep):
+    """Open or close a pneumatic piston."""
+
+    def __init__(self, piston, opened: bool, label: str = "piston"):
+        self.piston = piston
+        self.opened = opened
+        self.name = "%s %s" % ("open" if opened else "close", label)
+
+    def validate(self) -> list:
+        return [] if hasattr(self.piston, "open") and hasattr(self.piston, "close") else ["not a piston"]
+
+    def run(self):
+        if self.opened:
+            self.piston.open()
+        else:
+            self.piston.close()
+
+class waitStep(autonStep):
+    """Wait a fixed number of seconds."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.name = "wait %s s" % seconds
+
+    def plan(self, heading: float, routine) -> tuple:
+        return self.seconds, heading
+
+    def validate(self) -> list:
+        return [] if isNumber(self.seconds) and self.seconds >= 0 else ["seconds must be a number >= 0"]
+
+    def run(self):
+        wait(self.seconds, SECONDS)
+
+class waitUntilStep(autonStep):
+    """Wait until condition() is True, at most timeout seconds, checking every period ms.
+
+    planned is the expected wait in seconds, for the timeline.
+    """
+
+    def __init__(self, condition, timeout: float, label: str = "condition", planned: float = 0, period: int = 10):
+        self.condition = condition
+        self.timeout = timeout
+        self.planned = planned
+        self.period = period
+        self.timedOut = False
+        self.name = "wait until %s" % label
+
+    def plan(self, heading: float, routine) -> tuple:
+        return self.planned, heading
+
+    def validate(self) -> list:
+        problems = []
+        if not callable(self.condition):
+            problems.append("condition must be callable")
+        if not isNumber(self.timeout) or self.timeout <= 0:
+            problems.append("a timeout > 0 is required")
+        return problems
+
+    def run(self):
+        end = brain.timer.time(MSEC) + self.timeout * 1000
+        self.timedOut = False
+        while not self.condition():
+            if brain.timer.time(MSEC) >= end:
+                self.timedOut = True
+                return
+            wait(self.period, MSEC)
+
+class callStep(autonStep):
+    """Call function(*args), e.g. Longgoal or Stopallmotors; planned is its expected duration (s).
+
+    Usage:
+        callStep(stopdrivetrain, "stop drivetrain 2 s", planned = 2, args = (2,))
+    """
+
+    def __init__(self, function, label: str = None, planned: float = 0, args: tuple = ()):
+        self.function = function
+        self.args = tuple(args)
+        self.planned = planned
+        self.name = label if label is not None else getattr(function, "__name__", "call")
+
+    def plan(self, heading: float, routine) -> tuple:
+        return self.planned, heading
+
+    def validate(self) -> list:
+        problems = [] if callable(self.function) else ["function is not callable"]
+        if not isNumber(self.planned) or self.planned < 0:
+            problems.append("planned must be a number >= 0")
+        return problems
+
+    def run(self):
+        self.function(*self.args)
+
+class autonRoutine:
+    """Autonomous routine made of a list of autonStep objects.
+
+    The steps are checked with validate() before the match (checkRoutines(),
+    or when the routine is picked in the autonSelector). run() skips every
+    step that failed validation instead of crashing in the middle of the
+    autonomous, and times the other steps so timeline() can show the planned
+    against the actual duration of each one, which shows where the seconds
+    of a run go. A plan over timeLimit is reported, the routine still runs.
+    Calling the routine runs it, so it can be used wherever an auton
+    function is.
+
+    Parameters:
+        name: routine name used in the timeline
+        steps: list of autonStep
+        timeLimit: seconds available (15 for a match, 60 for skills)
+        turnRate: expected turn speed in deg/s, used to plan turn steps
+            (about 80 for rotatePID at speedCap 20)
+
+    Usage:
+        Left = autonRoutine("Left", [driveStep(320, 20), turnStep(340)])
+        Left.check()
+        Left()
+        print(Left.timeline())
+    """
+
+    def __init__(self, name: str, steps: list, timeLimit: float = 15, turnRate: float = 80):
+        self.name = name
+        self.steps = steps
+        self.timeLimit = timeLimit
+        self.turnRate = turnRate
+        self.planned = array('f', [0.0] * len(steps))
+        self.actual = array('f', [0.0] * len(steps))
+        self.starts = array('f', [0.0] * len(steps))
+        self.valid = None       # per step: passed validate(), None = not checked yet
+        self.completed = 0
+
+    def plan(self) -> float:
+        """Fill self.planned with the expected duration of every valid step and return the total."""
+        heading = 0.0
+        total = 0.0
+        for i in range(len(self.steps)):
+            if self.valid is not None and not self.valid[i]:
+                self.planned[i] = 0.0
+                continue
+            self.planned[i], heading = self.steps[i].plan(heading, self)
+            total += self.planned[i]
+        return total
+
+    def validate(self) -> list:
+        """Return a list of problems with the steps, empty when the routine is fine.
+
+        Also marks which steps are valid, run() skips the others.
+        """
+        problems = []
+        self.valid = [True] * len(self.steps)
+        for i in range(len(self.steps)):
+            step = self.steps[i]
+            if not isinstance(step, autonStep):
+                problems.append("%s step %d: not an autonStep" % (self.name, i + 1))
+                self.valid[i] = False
+                continue
+            for problem in step.validate():
+                problems.append("%s step %d (%s): %s" % (self.name, i + 1, step.name, problem))
+                self.valid[i] = False
+        total = self.plan()
+        if total > self.timeLimit:
+            problems.append("%s: planned %.1f s is over the %d s limit" % (self.name, total, self.timeLimit))
+        return problems
+
+    def check(self) -> bool:
+        """Print every problem from validate() and return True if there were none."""
+        problems = self.validate()
+        for problem in problems:
+            print(problem)
+        return not problems
+
+    def run(self):
+        """Run every valid step in order, recording its start and duration.
+
+        A routine that was not checked before is checked first.
+        """
+        if self.valid is None:
+            self.check()
+        self.plan()
+        self.completed = 0
+        start = brain.timer.time(MSEC)
+        for i in range(len(self.steps)):
+            stepStart = brain.timer.time(MSEC)
+            self.starts[i] = (stepStart - start) / 1000
+            if self.valid[i]:
+                self.steps[i].run()
+            self.actual[i] = (brain.timer.time(MSEC) - stepStart) / 1000
+            self.completed = i + 1
+
+    def __call__(self):
+        self.run()
+
+    def timeline(self) -> str:
+        """Return the planned and actual duration of every step of the last run."""
+        lines = [" #   start  planned  actual   diff  step"]
+        plannedTotal = 0.0
+        actualTotal = 0.0
+        for i in range(self.completed):
+            plannedTotal += self.planned[i]
+            actualTotal += self.actual[i]
+            name = self.steps[i].name if self.valid[i] else "skipped (invalid): %s" % getattr(self.steps[i], "name", self.steps[i])
+            lines.append("%2d %7.2f %8.2f %7.2f %+6.2f  %s" % (i + 1, self.starts[i], self.planned[i], self.actual[i], self.actual[i] - self.planned[i], name))
+        lines.append("   total  %8.2f %7.2f %+6.2f  (%d of %d steps)" % (plannedTotal, actualTotal, actualTotal - plannedTotal, self.completed, len(self.steps)))
+        return "\n".join(lines)
+
+    def saveTimeline(self, sd_file_name: str):
+        """Write the timeline of the last run to the SD card as CSV."""
+        buffer = bytearray("step, start, planned, actual, name\n", 'utf-8')
+        for i in range(self.completed):
+            buffer.extend(("%d,%.3f,%.3f,%.3f,%s\n" % (i + 1, self.starts[i], self.planned[i], self.actual[i], self.steps[i].name)).encode())
+        brain.sdcard.savefile(sd_file_name, buffer)
 
 # --------------------
-# PID setup
+# PID, drive and odometry setup
 # --------------------
 # create a turnPID instance for drivetrain rotation
 rotatePID = turnPID(yourSensor= gyro.heading , brain = brain, leftMotorGroup=left, rightMotorGroup=right, speedCap=20,
@@ -284,17 +1748,39 @@ rotatePID = turnPID(yourSensor= gyro.heading , brain = brain, leftMotorGroup=lef
                      KD = 0.07
                      )
 
+# profiled turns with feedforward at a higher cap, off until the drivetrain is
+# characterized: run characterize() on the robot, fit the gains with
+# `python src/sysid.py path/to/sdcard --feedforward` and fill them in here,
+# e.g. feedforward(kS = 1.5, kV = 0.1, kA = 0.008)
+turnFeedforward = None
+if turnFeedforward is not None:
+    rotatePID.useFeedforward(turnFeedforward, maxVelocity = 360, acceleration = 1800, speedCap = 60)
+
+# closed-loop straight drive used by forward()
+driveStraight = driveController(brain, left, right, gyro, wheelDiameter)
+
+# track the robot pose in the background from the start of the program
+odometry = poseEstimator(brain, left, right, gyro, wheelDiameter)
+odometry.start()
+
+# watch every motor and derate drive/intake output when they get hot
+motorHealth = motorHealthMonitor(brain, logFile = "motorEvents.csv")
+for name, motor in (("left_1", left_1), ("left_2", left_2), ("left_3", left_3), ("right_1", right_1), ("right_2", right_2), ("right_3", right_3)):
+    motorHealth.addMotor(name, motor, "drive")
+for name, motor in (("intake", intakeMotor), ("storage", storageMotor), ("out", outMotor)):
+    motorHealth.addMotor(name, motor, "intake")
+motorHealth.start()
+
 
 # --------------------
 # autonomous helpers
 # --------------------
 def forward(mm: int, speed: int= 20):
-    diameter = 82.55 # wheel diameter in mm
-    deg = mm*(360/(diameter*3.1416)) # calculates degrees to spin based on mm input
-    right.set_velocity(speed, PERCENT)
-    left.set_velocity(speed, PERCENT)
-    right.spin_for(FORWARD, deg, wait= False)
-    left.spin_for(FORWARD, deg, wait= True)
+    """Drive mm straight (negative = backwards) at up to speed percent, closed-loop with heading hold.
+
+    speed is derated by motorHealth when the drive motors run hot.
+    """
+    driveStraight.drive(mm, speed * motorHealth.scale("drive"))
 
 def Longgoal():
     intakeMotor.spin(FORWARD, 60, PERCENT)
@@ -306,10 +1792,10 @@ def Stopallmotors():
     storageMotor.stop()
     outMotor.stop()
 
-def stopdrivetrain(sec):
+def stopdrivetrain(sec = 0):
     wait(sec, SECONDS)
-    left.stop
-    right.stop
+    left.stop()
+    right.stop()
 
 # --------------------
 # autonomous routines
@@ -317,236 +1803,501 @@ def stopdrivetrain(sec):
 def tune():
     """Autonomous routine to tune turn PID for various angles.
     """
+    dashboard.start()
     for i in range(30, 360, 30):
         right.spin(FORWARD, 0)
         left.spin(FORWARD, 0)
-        rotatePID.tune(i, 2,sd_file_name='turnPID'+ str(i) + '.csv', stopButton=True)
+        rotatePID.tune(i, 2,sd_file_name='turnPID'+ str(i) + '.tlm', stopButton=True, binary=True)
         right.stop(HOLD)
         left.stop(HOLD)
         wait(2, SECONDS)
         right.spin(FORWARD, 0)
         left.spin(FORWARD, 0)
-        rotatePID.tune(0, 2,sd_file_name='turnPID'+ str(-i) + '.csv', stopButton=True)
+        rotatePID.tune(0, 2,sd_file_name='turnPID'+ str(-i) + '.tlm', stopButton=True, binary=True)
         wait(2, SECONDS)
         right.stop(HOLD)
         left.stop(HOLD)
-    
+    dashboard.stop()
+
+def characterize(rampRate: float = 4, rampLimit: float = 40, stepOutput: float = 40, stepTime: float = 2, period: int = 10):
+    """Autonomous routine that characterizes the drivetrain turn for the rotatePID feedforward.
+
+    Spins the robot on the spot twice and streams time, output and angle to
+    the SD card:
+        characterizeRamp.tlm: output ramps up by rampRate %/s to rampLimit,
+            slow enough that the acceleration is negligible (gives kS and kV)
+        characterizeStep.tlm: a stepOutput % step the other way for stepTime
+            seconds, the acceleration at the start gives kA
+    Fit the gains with `python src/sysid.py path/to/sdcard --feedforward`.
+    Needs room to spin, the robot turns many times.
+    """
+    sink = rotateSink(left, right)
+    timer = loopTimer(brain, period)
+    tests = (("characterizeRamp.tlm", rampLimit / rampRate, lambda t: min(rampRate * t, rampLimit)),
+             ("characterizeStep.tlm", stepTime, lambda t: -stepOutput))
+    for name, duration, output in tests:
+        writer = sdLogWriter(brain, name, ["time", "output", "angle"], binary = True)
+        writer.start()
+        sink.start()
+        timer.start()
+        try:
+            while timer.elapsed() < duration:
+                elapsed = timer.elapsed()
+                value = output(elapsed)
+                sink.apply(value)
+                writer.record(elapsed, value, gyro.heading())
+                timer.tick()
+        finally:
+            left.stop(BRAKE)
+            right.stop(BRAKE)
+            writer.close()
+        wait(2, SECONDS)
 
-def Left():
-    outPiston.open()
-    intakeMotor.spin(FORWARD, 80, PERCENT)
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(320, 10)
-    rotatePID.tune(340, 2)
-    forward(300, 10)
-    rotatePID.tune(225, 2)
-    forward(-400, 10)
-    storageMotor.spin(FORWARD, 80, PERCENT)
-    intakeMotor.spin(FORWARD, 60, PERCENT)
-    outMotor.spin(FORWARD, 80, PERCENT)
-    wait(2.5, SECONDS)
-    forward(1200, 10)
-    rotatePID.tune(180, 2)
-    forward(-500, 10)
 
-def Right():
-    outPiston.open()
-    intakeMotor.spin(FORWARD, 80, PERCENT)
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(320, 10)
-    rotatePID.tune(45, 2)
-    forward(300, 10)
-    rotatePID.tune(135, 2)
-    forward(850, 10)
-    rotatePID.tune(180, 2)
-    forward(-1000, 10)
-    storageMotor.spin(FORWARD, 80, PERCENT)
-    intakeMotor.spin(FORWARD, 60, PERCENT)
-    outMotor.spin(FORWARD, 80, PERCENT)
-
-def FullautonV1():
+Left = autonRoutine("Left", [
+    pistonStep(outPiston, True, "out"),
+    spinStep(intakeMotor, FORWARD, 80, "intake"),
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(320, 20),
+    turnStep(340),
+    driveStep(300, 20),
+    turnStep(225),
+    driveStep(-400, 20),
+    spinStep(storageMotor, FORWARD, 80, "storage"),
+    spinStep(intakeMotor, FORWARD, 60, "intake"),
+    spinStep(outMotor, FORWARD, 80, "out"),
+    waitStep(2.5),
+    driveStep(1200, 20),
+    turnStep(180),
+    driveStep(-500, 20),
+])
+
+Right = autonRoutine("Right", [
+    pistonStep(outPiston, True, "out"),
+    spinStep(intakeMotor, FORWARD, 80, "intake"),
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(320, 20),
+    turnStep(45),
+    driveStep(300, 20),
+    turnStep(135),
+    driveStep(850, 20),
+    turnStep(180),
+    driveStep(-1000, 20),
+    spinStep(storageMotor, FORWARD, 80, "storage"),
+    spinStep(intakeMotor, FORWARD, 60, "intake"),
+    spinStep(outMotor, FORWARD, 80, "out"),
+])
+
+FullautonV1 = autonRoutine("FullautonV1", [
     # start
-    outPiston.open()                                    # Extension outtake
-    #start to preload in long goal
-    forward(-795, 15)                                   # drive backwards
-    rotatePID.tune(-90, 2)                              # turn to -90°
-    forward(-555, 25)                                   # drive backwards to long goal
-    forward(-40, 5)
-    stopdrivetrain(2)
-    Longgoal()                                          # outake preload long goal
-    wait(0.7, SECONDS)                                  # wait for preload to be scored
-    Stopallmotors()
+    pistonStep(outPiston, True, "out"),                 # Extension outtake
+    # start to preload in long goal
+    driveStep(-795, 15),                                # drive backwards
+    turnStep(-90),                                      # turn to -90°
+    driveStep(-595, 25),                                # drive backwards to long goal
+    callStep(Longgoal),                                 # outake preload long goal
+    waitStep(0.7),                                      # wait for preload to be scored
+    callStep(Stopallmotors),
     # loader 1
-    loaderPiston.open()                                 # open the loader mech
-    intakeMotor.spin(FORWARD, 80, PERCENT)              # spin intake and storage inwards
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(720, 20)                                    # drive forward to the loader
-    wait(1.5, SECONDS)                                  # wait for a couple of blocks to come out the loader
-    Stopallmotors()                                     # stop intake
+    pistonStep(loaderPiston, True, "loader"),           # open the loader mech
+    spinStep(intakeMotor, FORWARD, 80, "intake"),       # spin intake and storage inwards
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(720, 20),                                 # drive forward to the loader
+    waitStep(1.5),                                      # wait for a couple of blocks to come out the loader
+    callStep(Stopallmotors),                            # stop intake
     # score red blocks loader 1
-    forward(-700, 25)                                   # drive backwards to long goal
-    forward(-40, 5)
-    stopdrivetrain(1)
-    loaderPiston.close()                                # close the loader mech
-    storageMotor.spin(FORWARD, 80, PERCENT)             # outtake the blue blocks
-    intakeMotor.spin(FORWARD, -80, PERCENT)
-    wait(0.85, SECONDS)                                 # time to outtake blue blocks
-    Longgoal()                                          # score in the long goal
-    wait(3.5, SECONDS)
-    Stopallmotors()
+    driveStep(-740, 25),                                # drive backwards to long goal
+    pistonStep(loaderPiston, False, "loader"),          # close the loader mech
+    spinStep(storageMotor, FORWARD, 80, "storage"),     # outtake the blue blocks
+    spinStep(intakeMotor, FORWARD, -80, "intake"),
+    waitStep(0.85),                                     # time to outtake blue blocks
+    callStep(Longgoal),                                 # score in the long goal
+    waitStep(3.5),
+    callStep(Stopallmotors),
     # push blocks in control zone
-    forward(180, 15)                                    # drive away from long goal
-    rotatePID.tune(0, 2)                                # turn to get to the side of long goal
-    forward(270, 15)
-    wait(0.2, SECONDS)
-    rotatePID.tune(-90, 2)
-    descorePiston.open()                                # open the descore mech
-    wait(1, SECONDS)
-    descorePiston.close()
-    forward(-850, 25)                                   # push blocks in control zone
+    driveStep(180, 15),                                 # drive away from long goal
+    turnStep(0),                                        # turn to get to the side of long goal
+    driveStep(270, 15),
+    waitStep(0.2),
+    turnStep(-90),
+    pistonStep(descorePiston, True, "descore"),         # open the descore mech
+    waitStep(1),
+    pistonStep(descorePiston, False, "descore"),
+    driveStep(-850, 25),                                # push blocks in control zone
+], timeLimit = 60)
 
 # if you read this, you really think i tested this? oh hell nah, that's to much work!
 
-def fullautonV2():
+fullautonV2 = autonRoutine("fullautonV2", [
     # start
-    outPiston.open()                                    # Extension outtake
-    #start to preload in long goal
-    forward(-795, 15)                                   # drive backwards
-    rotatePID.tune(90, 2)                               # turn to -90°
-    forward(-555, 25)                                   # drive backwards to long goal
-    forward(-40, 5)
-    stopdrivetrain(2)
-    Longgoal()                                          # outake preload long goal
-    wait(0.7, SECONDS)                                  # wait for preload to be scored
-    Stopallmotors()
+    pistonStep(outPiston, True, "out"),                 # Extension outtake
+    # start to preload in long goal
+    driveStep(-795, 15),                                # drive backwards
+    turnStep(90),                                       # turn to 90°
+    driveStep(-595, 25),                                # drive backwards to long goal
+    callStep(Longgoal),                                 # outake preload long goal
+    waitStep(0.7),                                      # wait for preload to be scored
+    callStep(Stopallmotors),
     # loader 1
-    loaderPiston.open()                                 # open the loader mech
-    intakeMotor.spin(FORWARD, 80, PERCENT)              # spin intake and storage inwards
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(720, 20)                                    # drive forward to the loader
-    wait(1.5, SECONDS)                                  # wait for blocks to come out the loader
-    Stopallmotors()                                     # stop intake
+    pistonStep(loaderPiston, True, "loader"),           # open the loader mech
+    spinStep(intakeMotor, FORWARD, 80, "intake"),       # spin intake and storage inwards
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(720, 20),                                 # drive forward to the loader
+    waitStep(1.5),                                      # wait for blocks to come out the loader
+    callStep(Stopallmotors),                            # stop intake
     # score blocks loader 1
-    forward(-700, 25)                                   # drive backwards to long goal
-    intakeMotor.spin(FORWARD, 60, PERCENT)
-    storageMotor.spin(FORWARD, 30, PERCENT)             # slower so that the blocks come out 1 by 1
-    outMotor.spin(FORWARD, -80, PERCENT)
-    wait(4, SECONDS)
+    driveStep(-700, 25),                                # drive backwards to long goal
+    spinStep(intakeMotor, FORWARD, 60, "intake"),
+    spinStep(storageMotor, FORWARD, 30, "storage"),     # slower so that the blocks come out 1 by 1
+    spinStep(outMotor, FORWARD, -80, "out"),
+    waitStep(4),
     # go intake 2 extra blocks
-    forward(180, 15)                                    # drive away from long goal
-    rotatePID.tune(0, 2)                                # turn to get to the side of long goal
-    forward(620, 15)
-    rotatePID.tune(-90, 2)                              # turn to the extra blocks
-    intakeMotor.spin(FORWARD, 80, PERCENT)              # spin intake and storage inwards
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(190, 15)
-    Stopallmotors()
+    driveStep(180, 15),                                 # drive away from long goal
+    turnStep(0),                                        # turn to get to the side of long goal
+    driveStep(620, 15),
+    turnStep(-90),                                      # turn to the extra blocks
+    spinStep(intakeMotor, FORWARD, 80, "intake"),       # spin intake and storage inwards
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(190, 15),
+    callStep(Stopallmotors),
     # drive back to long goal
-    wait(0.2, SECONDS)
-    forward(-190, 15)
-    rotatePID(0, 2)
-    forward(-620, 15)
-    rotatePID(90, 2)
-    forward(180, 25)                                    # drive to long goal
-    forward(-40, 5)
-    stopdrivetrain(2)
+    waitStep(0.2),
+    driveStep(-190, 15),
+    turnStep(0),
+    driveStep(-620, 15),
+    turnStep(90),
+    driveStep(140, 25),                                 # drive to long goal
     # score the extra blocks
-    Longgoal()
-    wait(2, SECONDS)
-    Stopallmotors()
+    callStep(Longgoal),
+    waitStep(2),
+    callStep(Stopallmotors),
     # drive to the long goal on the other side of the field
-    forward(180, 15)
-    rotatePID(0, 2)
-    forward(2500, 15)
-    rotatePID(90, 2)
-    forward(-180, 25)
-    forward(-40, 5)
-    stopdrivetrain()
+    driveStep(180, 15),
+    turnStep(0),
+    driveStep(2500, 15),
+    turnStep(90),
+    driveStep(-220, 25),
     # go empty loader
-    loaderPiston.open()                                 # open the loader mech
-    intakeMotor.spin(FORWARD, 80, PERCENT)              # spin intake and storage inwards
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(720, 20)                                    # drive forward to the loader
-    wait(1.5, SECONDS)                                  # wait for blocks to come out the loader
-    Stopallmotors()                                     # stop intake and outtake
+    pistonStep(loaderPiston, True, "loader"),           # open the loader mech
+    spinStep(intakeMotor, FORWARD, 80, "intake"),       # spin intake and storage inwards
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(720, 20),                                 # drive forward to the loader
+    waitStep(1.5),                                      # wait for blocks to come out the loader
+    callStep(Stopallmotors),                            # stop intake and outtake
     # go score blocks in long goal
-    forward(-720, 25)
-    forward(-40, 5)
-    stopdrivetrain()
-    loaderPiston.close()
-    intakeMotor.spin(FORWARD, 60, PERCENT)
-    storageMotor.spin(FORWARD, 30, PERCENT)             # slower so that the blocks come out 1 by 1
-    outMotor.spin(FORWARD, -80, PERCENT)
-    wait(4, SECONDS)
+    driveStep(-760, 25),
+    pistonStep(loaderPiston, False, "loader"),
+    spinStep(intakeMotor, FORWARD, 60, "intake"),
+    spinStep(storageMotor, FORWARD, 30, "storage"),     # slower so that the blocks come out 1 by 1
+    spinStep(outMotor, FORWARD, -80, "out"),
+    waitStep(4),
     # go intake extra blocks
-    forward(180, 15)                                    # drive away from long goal
-    rotatePID.tune(-180, 2)                             # turn to get to the side of long goal
-    forward(620, 15)
-    rotatePID.tune(-90, 2)                              # turn to the extra blocks
-    intakeMotor.spin(FORWARD, 80, PERCENT)              # spin intake and storage inwards
-    storageMotor.spin(REVERSE, 100, PERCENT)
-    forward(250, 15)
-    Stopallmotors()
+    driveStep(180, 15),                                 # drive away from long goal
+    turnStep(-180),                                     # turn to get to the side of long goal
+    driveStep(620, 15),
+    turnStep(-90),                                      # turn to the extra blocks
+    spinStep(intakeMotor, FORWARD, 80, "intake"),       # spin intake and storage inwards
+    spinStep(storageMotor, REVERSE, 100, "storage"),
+    driveStep(250, 15),
+    callStep(Stopallmotors),
     # drive back to long goal
-    wait(0.2, SECONDS)
-    forward(-190, 15)
-    rotatePID(0, 2)
-    forward(-620, 15)
-    rotatePID(90, 2)
-    forward(180, 25)                                    # drive to long goal
-    forward(-40, 5)
-    stopdrivetrain(2)
+    waitStep(0.2),
+    driveStep(-190, 15),
+    turnStep(0),
+    driveStep(-620, 15),
+    turnStep(90),
+    driveStep(140, 25),                                 # drive to long goal
     # score extra blocks
-    Longgoal()
-    wait(4, SECONDS)
+    callStep(Longgoal),
+    waitStep(4),
     # go park
-    forward(180, 15)
-    rotatePID(-180, 2)
-    forward(125, 15)
-    rotatePID(90, 2)
-    forward(2000, 100)
+    driveStep(180, 15),
+    turnStep(-180),
+    driveStep(125, 15),
+    turnStep(90),
+    driveStep(2000, 100),
+], timeLimit = 60)
 
 
-def backupauton():
-    intakeMotor.spin(FORWARD, 60, PERCENT)
-    wait(2, SECONDS)
-    intakeMotor.stop()   
+backupauton = autonRoutine("backupauton", [
+    spinStep(intakeMotor, FORWARD, 60, "intake"),
+    waitStep(2),
+    callStep(intakeMotor.stop, "stop intake"),
+])
+
+autonRoutines = [Left, Right, FullautonV1, fullautonV2, backupauton]
+
+def checkRoutines(routines = None) -> bool:
+    """Validate every step-list routine before the match and print the problems.
+
+    Returns True when no routine has a problem. Invalid steps are skipped
+    when the routine runs.
+    """
+    ok = True
+    for routine in (autonRoutines if routines is None else routines):
+        if not routine.check():
+            ok = False
+    return ok
 
 
 
 # --------------------
-# user control helpers
+# drive curves
+# --------------------
+def powerCurve(k: float):
+    """x^k curve, k = 1 is linear, k = 2 quadratic (fine control at low speeds)."""
+    return lambda x: x ** k / 100 ** (k - 1)
+
+def exponentialCurve(t: float):
+    """Exponential curve, t = 0 is linear and higher t is flatter near the middle."""
+    low = math.exp(-t / 10)
+    return lambda x: (low + math.exp((x - 100) / 10) * (1 - low)) * x
+
+def piecewiseCurve(points: list):
+    """Straight lines between (input, output) points on 0..100, e.g. [(0, 0), (60, 30), (100, 100)]."""
+    def curve(x):
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if x <= x1:
+                return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+        return points[-1][1]
+    return curve
+
+class driveCurve:
+    """Joystick to output mapping, precomputed for every joystick value.
+
+    The curve function is evaluated once for each input 0..100 when the
+    curve is created and stored, mirrored for negative inputs, in a 201
+    entry table, so lookup() is a single array read instead of float math
+    every tick.
+
+    Parameters:
+        name: shown on the controller screen when the curve is selected
+        curve: function mapping 0..100 to 0..100 (see powerCurve, exponentialCurve, piecewiseCurve)
+        deadband: inputs up to this size map to 0, the curve starts after it
+        scale: multiplier on the output, 0.75 limits the drive to 75%
+        slew: largest change of the output per update (%), None for no limit
+    """
+
+    def __init__(self, name: str, curve, deadband: int = 0, scale: float = 1.0, slew = None):
+        self.name = name
+        self.slew = slew
+        self.table = array('f', [0.0] * 201)
+        for x in range(deadband + 1, 101):
+            value = curve((x - deadband) * 100 / (100 - deadband)) * scale
+            self.table[100 + x] = value
+            self.table[100 - x] = -value
+
+    def lookup(self, x: int) -> float:
+        """Return the output for joystick value x (-100..100)."""
+        x = int(x)
+        if x > 100:
+            x = 100
+        elif x < -100:
+            x = -100
+        return self.table[100 + x]
+
+class driveCurveSelector:
+    """List of drive curves the driver can cycle through during the match.
+
+    forward() and turn() map an axis through the selected curve and apply
+    its slew limit; each axis keeps its own last output for that.
+
+    Usage:
+        curves = driveCurveSelector([driveCurve("quad", powerCurve(2))], controller_1)
+        driverInput.onPressed("Right", curves.next)
+        forwardSpeed = curves.forward(driverInput.axis(3))
+    """
+
+    def __init__(self, curves: list, controller = None):
+        self.curves = curves
+        self.controller = controller
+        self.index = 0
+        self.current = curves[0]
+        self.lastForward = 0.0
+        self.lastTurn = 0.0
+
+    def select(self, index: int):
+        """Switch to curve number index and show its name on the controller."""
+        self.index = index % len(self.curves)
+        self.current = self.curves[self.index]
+        if self.controller is not None:
+            self.controller.screen.clear_row(1)
+            self.controller.screen.set_cursor(1, 1)
+            self.controller.screen.print("curve: " + self.current.name)
+
+    def next(self):
+        self.select(self.index + 1)
+
+    def previous(self):
+        self.select(self.index - 1)
+
+    def limit(self, target: float, last: float) -> float:
+        slew = self.current.slew
+        if slew is None:
+            return target
+        if target > last + slew:
+            return last + slew
+        if target < last - slew:
+            return last - slew
+        return target
+
+    def forward(self, x: int) -> float:
+        self.lastForward = self.limit(self.current.lookup(x), self.lastForward)
+        return self.lastForward
+
+    def turn(self, x: int) -> float:
+        self.lastTurn = self.limit(self.current.lookup(x), self.lastTurn)
+        return self.lastTurn
+
+driveCurves = driveCurveSelector([
+    driveCurve("quadratic", powerCurve(2), scale = 0.75),
+    driveCurve("cubic", powerCurve(3), deadband = 3),
+    driveCurve("exponential", exponentialCurve(10), deadband = 3),
+    driveCurve("precise", piecewiseCurve([(0, 0), (70, 35), (100, 100)]), deadband = 3, slew = 8),
+    driveCurve("linear", powerCurve(1)),
+], controller_1)
+
+# --------------------
+# drive output
 # --------------------
-k = 2  # exponent constant for drive graph
+class driveOutputStage:
+    """Last stage between the driver's forward/turn commands and the drive motors.
+
+    Every drive() call:
+    - mixes forward and turn into left/right and, when one side would go past
+      100%, scales both sides down together so the turn ratio is kept
+    - limits how fast each side may speed up (acceleration, %/s) and slow
+      down (deceleration, %/s, None for no limit); a reversal slows down to 0
+      first and only the part past 0 counts as speeding up
+    - optionally holds a side's output while its current draw is above
+      tractionCurrent, so the wheels stop spinning up once they slip or stall
+    - rounds the outputs to `resolution` % and only sends a motor command when
+      a side's output changed
 
-def driveGraph(x, k):
-    """Map joystick input x with exponent k to a velocity curve.
+    Parameters:
+        brain: Brain instance (timer for dt)
+        left, right: drive MotorGroups
+        acceleration: largest increase of a side's output (%/s)
+        deceleration: largest decrease of a side's output (%/s), None = no limit
+        tractionCurrent: side current (A) above which the output is not increased, None = off
+        resolution: output step (%) below which no new command is sent
 
-    Positive and negative inputs are handled symmetrically.
+    Attributes:
+        issued, skipped: motor commands sent / left out because nothing changed
+        tractionLimited: number of updates where traction limiting held a side
     """
-    if x > 0:
-        return 3/4*((x**k)/10**((k-1)*2))
-    else:
-        return -3/4*((x**k)/10**((k-1)*2))
 
+    def __init__(self, brain: Brain, left: MotorGroup, right: MotorGroup, acceleration: float = 400, deceleration = None, tractionCurrent = None, resolution: float = 0.5):
+        self.brain = brain
+        self.left = left
+        self.right = right
+        self.acceleration = acceleration
+        self.deceleration = deceleration
+        self.tractionCurrent = tractionCurrent
+        self.resolution = resolution
+        self.leftOutput = 0.0
+        self.rightOutput = 0.0
+        self.leftIssued = None
+        self.rightIssued = None
+        self.lastTime = None
+        self.issued = 0
+        self.skipped = 0
+        self.tractionLimited = 0
+
+    def limit(self, target: float, output: float, dt: float, current: float) -> float:
+        """Move output towards target within the acceleration, deceleration and traction limits."""
+        if target * output < 0:
+            # reversal: slow down to 0 within the deceleration limit, then
+            # speed up the other way within the acceleration limit
+            stopTime = 0
+            if self.deceleration is not None:
+                stopTime = abs(output) / self.deceleration
+                if stopTime >= dt:
+                    step = self.deceleration * dt
+                    return output - step if output > 0 else output + step
+            if self.tractionCurrent is not None and current > self.tractionCurrent:
+                self.tractionLimited += 1
+                return 0.0
+            step = self.acceleration * (dt - stopTime)
+            if target > step:
+                return step
+            if target < -step:
+                return -step
+            return target
+        speedingUp = abs(target) > abs(output)
+        if speedingUp:
+            if self.tractionCurrent is not None and current > self.tractionCurrent:
+                self.tractionLimited += 1
+                return output
+            step = self.acceleration * dt
+        elif self.deceleration is None:
+            return target
+        else:
+            step = self.deceleration * dt
+        if target > output + step:
+            return output + step
+        if target < output - step:
+            return output - step
+        return target
+
+    def command(self, group: MotorGroup, value: float, issued) -> float:
+        value = round(value / self.resolution) * self.resolution
+        if value == issued:
+            self.skipped += 1
+            return issued
+        group.spin(FORWARD, value, PERCENT)
+        self.issued += 1
+        return value
+
+    def drive(self, forward: float, turn: float, maxOutput: float = 100):
+        """Drive with forward and turn in % (left = forward + turn); maxOutput scales the result."""
+        now = self.brain.timer.time(MSEC)
+        dt = 0 if self.lastTime is None else min(now - self.lastTime, 100) / 1000
+        self.lastTime = now
+
+        leftTarget = forward + turn
+        rightTarget = forward - turn
+        largest = max(abs(leftTarget), abs(rightTarget))
+        scale = maxOutput / 100
+        if largest > 100:
+            scale *= 100 / largest
+        leftTarget *= scale
+        rightTarget *= scale
+
+        leftCurrent = rightCurrent = 0
+        if self.tractionCurrent is not None:
+            leftCurrent = self.left.current(CurrentUnits.AMP)
+            rightCurrent = self.right.current(CurrentUnits.AMP)
+        self.leftOutput = self.limit(leftTarget, self.leftOutput, dt, leftCurrent)
+        self.rightOutput = self.limit(rightTarget, self.rightOutput, dt, rightCurrent)
+        self.leftIssued = self.command(self.left, self.leftOutput, self.leftIssued)
+        self.rightIssued = self.command(self.right, self.rightOutput, self.rightIssued)
+
+    def stop(self, mode = BRAKE):
+        """Stop both sides and forget the ramp state."""
+        self.left.stop(mode)
+        self.right.stop(mode)
+        self.leftOutput = self.rightOutput = 0.0
+        self.leftIssued = self.rightIssued = None
+        self.lastTime = None
+
+driveOutput = driveOutputStage(brain, left, right, acceleration = 400)
 
-def arcadeDriveGraph(left: MotorGroup, right: MotorGroup, controller: Controller, torqueOn: bool = False):
-    """Arcade drive: forward/back from left joystick axis3 (processed by driveGraph),
-    turn from right joystick axis1. Sets motor velocities and starts spinning.
-    this version includes quadratic drive graph for finer control at low speeds.
+# --------------------
+# user control helpers
+# --------------------
+def arcadeDriveGraph(inputs: controllerInput, torqueOn: bool = False):
+    """Arcade drive: forward/back from left joystick axis3, turn from right
+    joystick axis1, both mapped through the selected drive curve in
+    driveCurves and sent to the drive motors by driveOutput.
     If torqueOn is True, limits max speed to 60% for more torque.
+    The output is derated by motorHealth when the drive motors run hot.
+    Joystick values come from the last controllerInput snapshot.
     """
-    
-    if torqueOn:
-        right.set_velocity((driveGraph(controller.axis3.position(),2) - driveGraph(controller.axis1.position(),2))*6/10, PERCENT)
-        left.set_velocity((driveGraph(controller.axis3.position(),2) + driveGraph(controller.axis1.position(),2))*6/10, PERCENT)
-    else:
-        right.set_velocity((driveGraph(controller.axis3.position(),2) - driveGraph(controller.axis1.position(),2)), PERCENT)
-        left.set_velocity((driveGraph(controller.axis3.position(),2) + driveGraph(controller.axis1.position(),2)), PERCENT)
-    
-
-    left.spin(FORWARD)
-    right.spin(FORWARD)
+    forwardSpeed = driveCurves.forward(inputs.axis(3))
+    turnSpeed = driveCurves.turn(inputs.axis(1))
+    maxOutput = 60 if torqueOn else 100
+    driveOutput.drive(forwardSpeed, turnSpeed, maxOutput * motorHealth.scale("drive"))
 
 
 def inOutControl():
@@ -556,22 +2307,24 @@ def inOutControl():
     - R1:   score mid
     - R2:   score high
     - none: brake both motors
+    Speeds are derated by motorHealth when the intake motors run hot.
     """
-    if controller_1.buttonL1.pressing():
-        intakeMotor.spin(FORWARD, 60, PERCENT)
-        storageMotor.spin(FORWARD, 100, PERCENT)
-        outMotor.spin(REVERSE, 80, PERCENT) 
-    elif controller_1.buttonL2.pressing():
-        intakeMotor.spin(FORWARD, 60, PERCENT)
-        storageMotor.spin(FORWARD, 80, PERCENT)
-        outMotor.spin(FORWARD, 80, PERCENT)
-    elif controller_1.buttonR1.pressing():
-        intakeMotor.spin(FORWARD, 60, PERCENT)
-        storageMotor.spin(REVERSE, 80, PERCENT)
+    scale = motorHealth.scale("intake")
+    if driverInput.pressing("L1"):
+        intakeMotor.spin(FORWARD, 60 * scale, PERCENT)
+        storageMotor.spin(FORWARD, 100 * scale, PERCENT)
+        outMotor.spin(REVERSE, 80 * scale, PERCENT) 
+    elif driverInput.pressing("L2"):
+        intakeMotor.spin(FORWARD, 60 * scale, PERCENT)
+        storageMotor.spin(FORWARD, 80 * scale, PERCENT)
+        outMotor.spin(FORWARD, 80 * scale, PERCENT)
+    elif driverInput.pressing("R1"):
+        intakeMotor.spin(FORWARD, 60 * scale, PERCENT)
+        storageMotor.spin(REVERSE, 80 * scale, PERCENT)
         outMotor.stop(BRAKE)
-    elif controller_1.buttonR2.pressing():
-        intakeMotor.spin(REVERSE, 60, PERCENT)
-        storageMotor.spin(FORWARD, 80, PERCENT)
+    elif driverInput.pressing("R2"):
+        intakeMotor.spin(REVERSE, 60 * scale, PERCENT)
+        storageMotor.spin(FORWARD, 80 * scale, PERCENT)
         outMotor.stop(BRAKE)
     else:
         intakeMotor.stop(BRAKE)
@@ -579,31 +2332,102 @@ def inOutControl():
         outMotor.stop(BRAKE)
 
 def loaderMechControl():
-    """Toggles loader piston using controller button B.
+    """Toggles loader piston. Registered as press handler on controller button B.
     """
-    if controller_1.buttonB.pressing():
-        if loaderPiston.value() == 1:
-            loaderPiston.close()
-        else:
-            loaderPiston.open()
-    while controller_1.buttonB.pressing():
-        wait(1, MSEC)
+    if loaderPiston.value() == 1:
+        loaderPiston.close()
+    else:
+        loaderPiston.open()
 
 def descoreMechControl():
-    """Toggles descore piston using controller button Down.
+    """Toggles descore piston. Registered as press handler on controller button Down.
     """
-    if controller_1.buttonDown.pressing():
-        if descorePiston.value() == 1:
-            descorePiston.close()
-        else:
-            descorePiston.open()
-    while controller_1.buttonDown.pressing():
-        wait(1, MSEC)
+    if descorePiston.value() == 1:
+        descorePiston.close()
+    else:
+        descorePiston.open()
 
 # --------------------
 # UI classes
 # --------------------
-class button:
+class widget:
+    """Base of the retained-mode touchscreen UI: a rectangle in a widget tree.
+
+    A widget only paints its own rectangle in draw(); screenUI decides when.
+    Changing a widget calls invalidate(), and the next screenUI.refresh()
+    redraws only the invalidated widgets (and their children) instead of the
+    whole screen.
+
+    Parameters:
+        posX, posY: top-left position on brain screen
+        width, height: size of rectangle
+
+    Attributes:
+        children: widgets drawn on top of this one
+        onPress: function called when the widget is touched, None = not touchable
+        dirty: True when the widget has to be redrawn
+    """
+
+    def __init__(self, posX: int, posY: int, width: int, height: int):
+        self.posX = posX
+        self.posY = posY
+        self.width = width
+        self.height = height
+        self.children = []
+        self.onPress = None
+        self.dirty = True
+
+    def add(self, child):
+        """Add a child widget and return it."""
+        self.children.append(child)
+        return child
+
+    def contains(self, touchX: int, touchY: int) -> bool:
+        return self.posX < touchX < self.posX + self.width and self.posY < touchY < self.posY + self.height
+
+    def invalidate(self):
+        """Mark the widget to be redrawn on the next refresh."""
+        self.dirty = True
+
+    def draw(self):
+        pass
+
+class panel(widget):
+    """Container widget; filled with color, or transparent when color is None."""
+
+    def __init__(self, posX: int = 0, posY: int = 0, width: int = 480, height: int = 240, color = None):
+        widget.__init__(self, posX, posY, width, height)
+        self.color = color
+
+    def draw(self):
+        if self.color is not None:
+            brain.screen.set_pen_color(self.color)
+            brain.screen.draw_rectangle(self.posX, self.posY, self.width, self.height, self.color)
+
+class label(widget):
+    """Text on a filled rectangle, one line per '\\n'."""
+
+    def __init__(self, posX: int, posY: int, width: int, height: int, text: str = "", color = Color.WHITE, background = Color.BLACK):
+        widget.__init__(self, posX, posY, width, height)
+        self.text = text
+        self.color = color
+        self.background = background
+
+    def setText(self, text: str):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+
+    def draw(self):
+        brain.screen.set_pen_color(self.background)
+        brain.screen.draw_rectangle(self.posX, self.posY, self.width, self.height, self.background)
+        brain.screen.set_pen_color(self.color)
+        y = self.posY + 20
+        for line in self.text.split("\n"):
+            brain.screen.print_at(line, x = self.posX + 5, y = y, opaque = False)
+            y += 20
+
+class button(widget):
     """touchscreen button object
 
     Parameters:
@@ -611,16 +2435,20 @@ class button:
         posX, posY: top-left position on brain screen
         color: VEX Color
         text: label shown on the button
+        onPress: function called when the button is touched (in a screenUI)
     """
 
-    def __init__(self, height:int, width:int, posX:int, posY:int, color, text:str) -> None:
-        self.height = height
-        self.width = width
-        self.posX = posX
-        self.posY = posY
+    def __init__(self, height:int, width:int, posX:int, posY:int, color, text:str, onPress = None) -> None:
+        widget.__init__(self, posX, posY, width, height)
         self.Pressed = False
         self.color = color
         self.text = text
+        self.onPress = onPress
+
+    def setColor(self, color):
+        if color != self.color:
+            self.color = color
+            self.invalidate()
 
     def draw(self):
         """Draw the button on the brain screen."""
@@ -631,15 +2459,229 @@ class button:
 
     def isPressed(self, touchX:int, touchY:int) -> bool:
         """Return True if the provided touch coordinates are inside this button."""
-        if touchX > self.posX and touchX < self.posX + self.width and touchY > self.posY and touchY < self.posY + self.height:
-            self.Pressed = True
-        else:
-            self.Pressed = False
+        self.Pressed = self.contains(touchX, touchY)
         return self.Pressed
 
+class gridLayout:
+    """Places widgets in a uniform grid of columns x rows cells.
+
+    Parameters:
+        columns, rows: grid size
+        posX, posY, width, height: area the grid fills
+        gapX, gapY: space between cells
+        columnMajor: fill the first column top to bottom before the next one
+    """
+
+    def __init__(self, columns: int, rows: int, posX: int = 10, posY: int = 10, width: int = 460, height: int = 230, gapX: int = 20, gapY: int = 10, columnMajor: bool = True):
+        self.columns = columns
+        self.rows = rows
+        self.posX = posX
+        self.posY = posY
+        self.gapX = gapX
+        self.gapY = gapY
+        self.cellWidth = (width - gapX * (columns - 1)) // columns
+        self.cellHeight = (height - gapY * (rows - 1)) // rows
+        self.columnMajor = columnMajor
+        self.capacity = columns * rows
+
+    def place(self, widgets: list) -> list:
+        """Position and size the widgets (at most capacity of them) and return them."""
+        for i in range(min(len(widgets), self.capacity)):
+            if self.columnMajor:
+                column, row = i // self.rows, i % self.rows
+            else:
+                column, row = i % self.columns, i // self.columns
+            w = widgets[i]
+            w.posX = self.posX + column * (self.cellWidth + self.gapX)
+            w.posY = self.posY + row * (self.cellHeight + self.gapY)
+            w.width = self.cellWidth
+            w.height = self.cellHeight
+            w.invalidate()
+        return widgets
+
+class flowLayout:
+    """Places widgets left to right at their own size, wrapping to a new line when the row is full.
+
+    Parameters:
+        posX, posY, width, height: area to fill
+        gap: space between widgets and lines
+    """
+
+    def __init__(self, posX: int = 10, posY: int = 10, width: int = 460, height: int = 230, gap: int = 10):
+        self.posX = posX
+        self.posY = posY
+        self.width = width
+        self.height = height
+        self.gap = gap
+
+    def place(self, widgets: list) -> int:
+        """Position the widgets and return how many fit in the area."""
+        x = self.posX
+        y = self.posY
+        lineHeight = 0
+        for i in range(len(widgets)):
+            w = widgets[i]
+            if x > self.posX and x + w.width > self.posX + self.width:
+                x = self.posX
+                y += lineHeight + self.gap
+                lineHeight = 0
+            if y + w.height > self.posY + self.height:
+                return i
+            w.posX = x
+            w.posY = y
+            w.invalidate()
+            x += w.width + self.gap
+            if w.height > lineHeight:
+                lineHeight = w.height
+        return len(widgets)
+
+class hitGrid:
+    """Touch index: the 480x240 screen split into uniform cells, each listing the touchable widgets over it.
+
+    build() is run once per page; lookup() then only checks the few widgets
+    in the touched cell, no matter how many widgets the page has.
+
+    Parameters:
+        cellSize: cell width and height in pixels
+    """
+
+    def __init__(self, cellSize: int = 40, width: int = 480, height: int = 240):
+        self.cellSize = cellSize
+        self.columns = (width + cellSize - 1) // cellSize
+        self.rows = (height + cellSize - 1) // cellSize
+        self.cells = [[] for _ in range(self.columns * self.rows)]
+
+    def clear(self):
+        for cell in self.cells:
+            del cell[:]
+
+    def insert(self, w: widget):
+        first = max(0, w.posX // self.cellSize)
+        last = min(self.columns - 1, (w.posX + w.width) // self.cellSize)
+        top = max(0, w.posY // self.cellSize)
+        bottom = min(self.rows - 1, (w.posY + w.height) // self.cellSize)
+        for row in range(top, bottom + 1):
+            for column in range(first, last + 1):
+                self.cells[row * self.columns + column].append(w)
+
+    def build(self, root: widget):
+        """Index every touchable widget in the tree; later widgets are on top."""
+        self.clear()
+        stack = [root]
+        order = []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            for i in range(len(node.children) - 1, -1, -1):
+                stack.append(node.children[i])
+        for node in order:
+            if node.onPress is not None:
+                self.insert(node)
+
+    def lookup(self, touchX: int, touchY: int):
+        """Return the topmost touchable widget under the touch, or None."""
+        column = touchX // self.cellSize
+        row = touchY // self.cellSize
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+        cell = self.cells[row * self.columns + column]
+        for i in range(len(cell) - 1, -1, -1):
+            if cell[i].contains(touchX, touchY):
+                return cell[i]
+        return None
+
+class screenUI:
+    """Retained-mode renderer and touch dispatcher for the brain screen.
+
+    show() puts a widget tree on the screen: the background image is drawn
+    from the SD card once and every widget on top of it. After that,
+    refresh() only redraws widgets that were invalidated; everything else
+    stays in the screen buffer, which render() then shows in one go.
+    Touches arrive through the brain.screen.pressed event, so nothing polls
+    and the program keeps running (e.g. calibrating) while the UI is up;
+    they are dispatched through a hitGrid built when the page is shown.
+
+    Parameters:
+        brain: Brain instance
+        background: image file on the SD card drawn behind every page, or None
+
+    Attributes:
+        frames: number of refreshes that drew something
+        lastFrame, maxFrame: time (us) the last and the slowest refresh took
+    """
+
+    def __init__(self, brain: Brain, background = None):
+        self.brain = brain
+        self.background = background
+        self.root = None
+        self.index = hitGrid()
+        self.fullRedraw = True
+        self.attached = False
+        self.frames = 0
+        self.lastFrame = 0
+        self.maxFrame = 0
+
+    def attach(self):
+        """Start receiving touches."""
+        if not self.attached:
+            self.attached = True
+            self.brain.screen.pressed(self.touched)
+
+    def show(self, root: widget):
+        """Replace the widget tree on screen and draw it completely."""
+        self.root = root
+        self.index.build(root)
+        self.fullRedraw = True
+        self.refresh()
+
+    def drawTree(self, node: widget, force: bool) -> bool:
+        drawn = False
+        if force or node.dirty:
+            node.draw()
+            node.dirty = False
+            force = True        # a redrawn widget paints over its children
+            drawn = True
+        for child in node.children:
+            if self.drawTree(child, force):
+                drawn = True
+        return drawn
+
+    def refresh(self):
+        """Redraw what changed since the last refresh and render it."""
+        if self.root is None:
+            return
+        start = self.brain.timer.system_high_res()
+        full = self.fullRedraw
+        if full:
+            self.brain.screen.clear_screen()
+            if self.background is not None:
+                self.brain.screen.draw_image_from_file(self.background, 0, 0)
+            self.fullRedraw = False
+        if self.drawTree(self.root, full) or full:
+            self.brain.screen.render()
+            self.frames += 1
+            self.lastFrame = self.brain.timer.system_high_res() - start
+            if self.lastFrame > self.maxFrame:
+                self.maxFrame = self.lastFrame
+
+    def touched(self):
+        if self.root is None:
+            return
+        target = self.index.lookup(self.brain.screen.x_position(), self.brain.screen.y_position())
+        if target is not None:
+            target.onPress()
+            self.refresh()
+
 
 class autonSelector:
-    """Simple touchscreen autonomous routine selector.
+    """Touchscreen autonomous routine selector.
+
+    display() puts the selection page on the screen and returns at once;
+    touches are handled by a screenUI, so gyro calibration and other
+    pre-match setup can run while the driver picks. Touching an auton opens
+    a confirm page with its description, Confirm stores the routine in
+    self.selected. Up to 8 autons fit on one page (two columns of four);
+    with more, they are split over pages of 6 with prev/next buttons.
 
     Parameters:
         autons: list of callable autonomous functions
@@ -649,7 +2691,8 @@ class autonSelector:
 
     Usage:
         selector = autonSelector([auton1, auton2], ["A1","A2"], ["desc1","desc2"], "background.png")
-        selected = selector.display()  # blocks until user confirms selection
+        selector.display()      # returns immediately
+        comp = Competition(user_control, selector.run)
     """
 
     def __init__(self, autons:list, names:list, doc:list, background) -> None:
@@ -658,95 +2701,335 @@ class autonSelector:
         self.doc = doc
         self.background = background
         self.selected = lambda: None
+        self.confirmed = False
+        self.choice = 0
+        self.ui = screenUI(brain, background)
+
+        # selection pages: two columns of buttons from provided names
+        buttons = [button(50, 220, 0, 0, Color.GREEN, str(self.names[i]), lambda i=i: self.choose(i)) for i in range(len(self.autons))]
+        if len(buttons) <= 8:
+            layout = gridLayout(2, 4)
+        else:
+            layout = gridLayout(2, 3, height = 170)
+        self.pages = []
+        for first in range(0, len(buttons), layout.capacity):
+            page = panel()
+            for b in layout.place(buttons[first:first + layout.capacity]):
+                page.add(b)
+            self.pages.append(page)
+        if len(self.pages) > 1:
+            navigation = gridLayout(3, 1, posY = 190, height = 40, columnMajor = False)
+            for n in range(len(self.pages)):
+                navigation.place([
+                    self.pages[n].add(button(0, 0, 0, 0, Color.WHITE, "< prev", lambda n=n: self.showPage(n - 1))),
+                    self.pages[n].add(label(0, 0, 0, 0, "page %d/%d" % (n + 1, len(self.pages)))),
+                    self.pages[n].add(button(0, 0, 0, 0, Color.WHITE, "next >", lambda n=n: self.showPage(n + 1))),
+                ])
+        self.page = 0
+
+        # confirm page: confirm/cancel with the description of the chosen auton
+        self.confirmPage = panel()
+        self.confirmPage.add(button(60, 220, 10, 10, Color.GREEN, "Confirm", self.confirm))
+        self.confirmPage.add(button(60, 220, 250, 10, Color.RED, "Cancel", self.cancel))
+        self.description = self.confirmPage.add(label(10, 80, 460, 150))
+
+        # after confirming: only the name of the selected auton
+        self.donePage = panel()
+        self.doneLabel = self.donePage.add(label(10, 10, 460, 30))
 
     def display(self):
-        """Show the selector UI and return the selected autonomous function.
+        """Show the selector UI; returns immediately."""
+        self.ui.attach()
+        self.showPage(self.page)
+
+    def showPage(self, n: int):
+        self.page = n % len(self.pages)
+        self.ui.show(self.pages[self.page])
+
+    def choose(self, i: int):
+        self.choice = i
+        self.description.setText(self.doc[i])
+        self.ui.show(self.confirmPage)
+
+    def confirm(self):
+        # user confirmed selection: store function, step-list routines are checked now
+        self.selected = self.autons[self.choice]
+        self.confirmed = True
+        text = "auton: " + str(self.names[self.choice])
+        if isinstance(self.selected, autonRoutine):
+            problems = self.selected.validate()
+            for problem in problems:
+                print(problem)
+            if problems:
+                text += "  (%d problems, see console)" % len(problems)
+        self.doneLabel.setText(text)
+        self.ui.show(self.donePage)
+
+    def cancel(self):
+        # go back to the selection page the auton was on
+        self.showPage(self.page)
+
+    def run(self):
+        """Run the selected autonomous routine."""
+        self.selected()
 
-        The method blocks until the user confirms an auton on the touchscreen.
-        """
-        buttons = []
-        brain.screen.draw_image_from_file(self.background, 0, 0)
 
-        # create a vertical list of buttons from provided names
-        for i in range(1, len(self.autons) + 1):
-            if i < 5:
-                buttons.append(button(50, 220, 10, 10 + (i-1)*60, Color.GREEN, str(self.names[i-1])))
-            else:
-                buttons.append(button(50, 220, 250, 10 + (i-5)*60, Color.GREEN, str(self.names[i-1])))
-            buttons[i-1].draw()
-        brain.screen.render()
+# --------------------
+# dashboard
+# --------------------
+class telemetryDashboard:
+    """Live feedback on the brain and controller screens without slowing the control loops.
+
+    The brain screen shows a rolling plot of the registered traces (e.g.
+    heading error and output) on the left and the temperature and current
+    of the registered motors below it. Everything is drawn into the back
+    buffer and shown with a single render() per frame, so nothing flickers.
+
+    step() is rate limited: it returns at once unless `period` ms passed
+    since the last frame or a frame is still being drawn. A frame is drawn
+    by a generator that yields after every line segment and motor row, so
+    each step() stops once `budget` us are spent and the next call resumes
+    at the same segment. The frame is only rendered when it is complete;
+    until then the previous frame stays on screen. The controller screen is
+    much slower to write, so it gets one changed row every controllerPeriod ms.
 
-        # wait for touches and handle confirm/cancel dialogs
-        while True:
-            if brain.screen.pressing():
-                touchX = brain.screen.x_position()
-                touchY = brain.screen.y_position()
-                for i in range(len(buttons)):
-                    if buttons[i].isPressed(touchX, touchY):
-                        # show confirm/cancel with description
-                        brain.screen.clear_screen()
-                        brain.screen.draw_image_from_file(self.background, 0, 0)
-                        brain.screen.render()
-                        confirm = button(60, 220, 10, 10, Color.GREEN, "Confirm")
-                        cancel = button(60, 220, 250, 10, Color.RED, "Cancel")
-                        confirm.draw()
-                        cancel.draw()
-                        # print description text
-                        brain.screen.set_pen_color(Color.WHITE)
-                        brain.screen.set_cursor(5, 1)
-                        for txt in self.doc[i].split('\n'):
-                            brain.screen.print(txt, opaque = False, sep='\n')
-                            brain.screen.new_line()
-                        wait(1, SECONDS)
-                        brain.screen.render()
-
-                        while True:
-                            if brain.screen.pressing():
-                                touchX = brain.screen.x_position()
-                                touchY = brain.screen.y_position()
-                                if confirm.isPressed(touchX, touchY):
-                                    # user confirmed selection: store function and return it
-                                    self.selected = self.autons[i]
-                                    brain.screen.clear_screen()
-                                    brain.screen.draw_image_from_file("background.png", 0, 0)
-                                    brain.screen.render()
-                                    return self.selected
-                                elif cancel.isPressed(touchX, touchY):
-                                    # go back to main selection screen
-                                    brain.screen.clear_screen()
-                                    brain.screen.draw_image_from_file(self.background, 0, 0)
-                                    for j in range(len(buttons)):
-                                        buttons[j].draw()
-                                    brain.screen.render()
-                                    break
-                            wait(100)
-            wait(100)
+    Parameters:
+        brain: Brain instance
+        controller: Controller for the summary (rows 2 and 3), or None
+        period: ms between frames
+        budget: drawing time per frame in us
+        samples: points in the rolling plot
+        controllerPeriod: ms between controller screen writes
+
+    Attributes:
+        frames, overBudget: frames rendered / steps that ran out of budget
+        frameTime, maxFrameTime: time (us) of the last and the slowest step
+
+    Usage:
+        dashboard.addTrace("error", lambda: rotatePID.controller.error, Color.RED, -90, 90)
+        dashboard.addMotor("L", left)
+        driverTasks.addTask("screen", dashboard.step, 20)   # or dashboard.start()
+    """
+
+    plotX = 0
+    plotY = 0
+    plotWidth = 240
+    plotHeight = 160
+    textY = 170
+
+    def __init__(self, brain: Brain, controller = None, period: int = 100, budget: int = 2000, samples: int = 60, controllerPeriod: int = 500):
+        self.brain = brain
+        self.controller = controller
+        self.period = period
+        self.budget = budget
+        self.samples = samples
+        self.controllerPeriod = controllerPeriod
+        self.traces = []        # [name, function, color, low, high, array('f')]
+        self.motors = []        # (name, device)
+        self.head = 0
+        self.count = 0
+        self.sections = [self.drawPlot, self.drawMotors]
+        self.drawing = None     # generator of the frame being drawn
+        self.lastFrame = None
+        self.lastController = None
+        self.controllerRow = 0
+        self.controllerText = ["", ""]
+        self.frames = 0
+        self.overBudget = 0
+        self.frameTime = 0
+        self.maxFrameTime = 0
+        self.running = False
+        self.thread = None
+
+    def addTrace(self, name: str, function, color, low: float, high: float):
+        """Plot function() between low (bottom) and high (top) of the plot."""
+        self.traces.append([name, function, color, low, high, array('f', [0.0] * self.samples)])
+
+    def addMotor(self, name: str, device):
+        """Show the temperature and current of a Motor or MotorGroup."""
+        self.motors.append((name, device))
+
+    def sample(self):
+        for trace in self.traces:
+            trace[5][self.head] = trace[1]()
+        self.head = (self.head + 1) % self.samples
+        if self.count < self.samples:
+            self.count += 1
+
+    def step(self):
+        """Draw part of a frame, at most `budget` us; cheap to call every control tick."""
+        now = self.brain.timer.time(MSEC)
+        if self.drawing is None:
+            if self.lastFrame is not None and now - self.lastFrame < self.period:
+                return
+            self.lastFrame = now
+            self.sample()
+            self.drawing = self.frame()
+            if self.controller is not None and (self.lastController is None or now - self.lastController >= self.controllerPeriod):
+                self.lastController = now
+                self.updateController()
+        start = self.brain.timer.system_high_res()
+        for _ in self.drawing:
+            if self.brain.timer.system_high_res() - start > self.budget:
+                self.overBudget += 1
+                break
+        else:
+            self.drawing = None
+            self.brain.screen.render()
+            self.frames += 1
+        self.frameTime = self.brain.timer.system_high_res() - start
+        if self.frameTime > self.maxFrameTime:
+            self.maxFrameTime = self.frameTime
+
+    def frame(self):
+        """Generator drawing one frame into the back buffer, section by section."""
+        for section in self.sections:
+            yield from section()
+
+    def drawPlot(self):
+        screen = self.brain.screen
+        screen.set_pen_color(Color.BLACK)
+        screen.draw_rectangle(self.plotX, self.plotY, self.plotWidth, self.plotHeight, Color.BLACK)
+        step = self.plotWidth / (self.samples - 1)
+        legendX = self.plotX + 5
+        # copy the samples, new ones arrive while the frame is drawn
+        head = self.head
+        count = self.count
+        first = head - count
+        for name, function, color, low, high, data in self.traces:
+            data = array('f', data)
+            screen.set_pen_color(color)
+            screen.print_at(name, x = legendX, y = self.plotY + 15, opaque = False)
+            legendX += 10 * len(name) + 15
+            scale = self.plotHeight / (high - low)
+            lastX = lastY = None
+            for i in range(count):
+                value = data[(first + i) % self.samples]
+                if value > high:
+                    value = high
+                elif value < low:
+                    value = low
+                x = int(self.plotX + (self.samples - count + i) * step)
+                y = int(self.plotY + self.plotHeight - (value - low) * scale)
+                if lastX is not None:
+                    # set again per segment, other code may draw on the screen between steps
+                    screen.set_pen_color(color)
+                    screen.draw_line(lastX, lastY, x, y)
+                    yield
+                lastX = x
+                lastY = y
+
+    def drawMotors(self):
+        screen = self.brain.screen
+        screen.set_pen_color(Color.BLACK)
+        screen.draw_rectangle(0, self.textY, 480, 240 - self.textY, Color.BLACK)
+        x = 5
+        y = self.textY + 20
+        for name, device in self.motors:
+            temperature = device.temperature(TemperatureUnits.CELSIUS)
+            screen.set_pen_color(Color.RED if temperature >= 55 else Color.WHITE)
+            screen.print_at("%s %dC %.1fA" % (name, temperature, device.current(CurrentUnits.AMP)), x = x, y = y, opaque = False)
+            yield
+            x += 160
+            if x > 400:
+                x = 5
+                y += 20
+
+    def summary(self) -> list:
+        """Return the two controller summary rows."""
+        values = ["%s %.1f" % (trace[0], trace[5][(self.head - 1) % self.samples]) for trace in self.traces[:2]]
+        hottest = ""
+        if self.motors:
+            name, device = max(self.motors, key = lambda m: m[1].temperature(TemperatureUnits.CELSIUS))
+            hottest = "%s %dC " % (name, device.temperature(TemperatureUnits.CELSIUS))
+        return [" ".join(values), hottest + "bat %d%%" % self.brain.battery.capacity()]
+
+    def updateController(self):
+        """Write at most one changed row of the summary to the controller."""
+        rows = self.summary()
+        for k in range(2):
+            row = (self.controllerRow + k) % 2
+            if rows[row] != self.controllerText[row]:
+                self.controllerText[row] = rows[row]
+                self.controller.screen.clear_row(row + 2)
+                self.controller.screen.set_cursor(row + 2, 1)
+                self.controller.screen.print(rows[row])
+                self.controllerRow = (row + 1) % 2
+                return
+
+    def loop(self):
+        while self.running:
+            self.step()
+            wait(10, MSEC)
+
+    def start(self):
+        """Run step() in a background Thread (e.g. while a tune() loop blocks)."""
+        if not self.running:
+            self.running = True
+            self.lastFrame = None
+            self.thread = Thread(self.loop)
+
+    def stop(self):
+        self.running = False
 
 
 # --------------------
 # UI setup and competition
 # --------------------
 selector = autonSelector(
-    [Left, Right, tune, FullautonV1, fullautonV2, backupauton, lambda: None, lambda: None],
-    ["Left", "Right", "Tune", "Auto Skills V1", "Auto Skills V2", "Backup Auton", "empty", "empty"],
-    ["LEFT\n placement:\n  paralel with wall\n  contacting start of Left park zone corner\n  with right back", "RIGHT\n placement:\n  paralel with wall\n  contacting start of Right park zone corner\n  with left back","", "", "", "", "", ""],
+    [Left, Right, tune, FullautonV1, fullautonV2, backupauton, characterize, lambda: None],
+    ["Left", "Right", "Tune", "Auto Skills V1", "Auto Skills V2", "Backup Auton", "Characterize", "empty"],
+    ["LEFT\n placement:\n  paralel with wall\n  contacting start of Left park zone corner\n  with right back", "RIGHT\n placement:\n  paralel with wall\n  contacting start of Right park zone corner\n  with left back","", "", "", "", "CHARACTERIZE\n spins on the spot for the\n turn feedforward, needs free space", ""],
     "background.png"
     )
 
+# controller snapshots, sampled once per tick before the subsystems run
+driverInput = controllerInput(brain, controller_1)
+partnerInput = controllerInput(brain, controller_2)
+driverInput.onPressed("B", loaderMechControl)
+driverInput.onPressed("Down", descoreMechControl)
+driverInput.onPressed("Right", driveCurves.next)
+driverInput.onPressed("Left", driveCurves.previous)
+
+def sampleInputs():
+    driverInput.sample()
+    partnerInput.sample()
+
+# live heading error/output and motor state on the brain and controller screens
+dashboard = telemetryDashboard(brain, controller_1)
+dashboard.addTrace("error", lambda: rotatePID.controller.error, Color.RED, -90, 90)
+dashboard.addTrace("output", lambda: rotatePID.output, Color.CYAN, -100, 100)
+dashboard.addMotor("L", left)
+dashboard.addMotor("R", right)
+dashboard.addMotor("in", intakeMotor)
+dashboard.addMotor("st", storageMotor)
+dashboard.addMotor("out", outMotor)
+
+# driver control subsystems, each at its own rate
+driverTasks = taskExecutor(brain, 10)
+driverTasks.addTask("input", sampleInputs, 10)
+driverTasks.addTask("drive", lambda: arcadeDriveGraph(driverInput), 10)
+driverTasks.addTask("intake", inOutControl, 20)
+driverTasks.addTask("screen", dashboard.step, 20)
+
 def user_control():
     brain.screen.clear_screen()
     brain.screen.print("user control code")
     outPiston.open()
-    while True:
-        arcadeDriveGraph(left, right, controller_1)
-        inOutControl()
-        loaderMechControl()
-        descoreMechControl()
-        wait(20, MSEC)
+    driverTasks.run()
+
+def preMatch():
+    """Runs once when the program starts on the brain, before the match."""
+    # problems with the step-list routines are printed to the console
+    checkRoutines()
+    # show selector COMMENT OUT IF NOT USING AUTON
+    # display() does not block; run autonomous with Competition(user_control, selector.run)
+    # selector.display()
 
-# show selector COMMENT OUT IF NOT USING AUTON
-# selector.display()
+# the simulator imports this file as a module, routines are checked when they run
+if __name__ == "__main__":
+    preMatch()
 
 # create competition instance
-comp = Competition(user_control, fullautonV2)
+comp = Competition(user_control, fullautonV2.run)
 
@@ -0,0 +1,198 @@
+"""
+Step response metrics for the turnPID tuning logs.
+
+All logs are stacked into one (logs, samples) array padded with NaN, so
+every metric is a handful of NumPy operations over all logs at once instead
+of a Python loop per log. Per log it computes:
+
+    riseTime            time for the error to go from 90% to 10% of its initial value (s)
+    settleTime          time after which |error| stays within tollerance (s, NaN if it never does)
+    overshoot           largest error past the setpoint (deg)
+    steadyStateError    |error| at the end of the log (deg)
+    iae, itae           integral of |error| and of t * |error| (deg s, deg s^2)
+    saturation          fraction of samples where |output| is at the output cap
+
+The CLI summarizes a set of logs and compares it against a saved baseline,
+exiting with 1 if the new gains are worse, so a gain change can be accepted
+or rejected by a script.
+
+usage:
+    python src/metrics.py path/to/sdcard                            # metrics per log
+    python src/metrics.py old_logs --save-baseline baseline.json
+    python src/metrics.py new_logs --baseline baseline.json --slack 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import telemetry
+
+METRICS = ("riseTime", "settleTime", "overshoot", "steadyStateError", "iae", "itae", "saturation")
+
+
+def angleError(desiredValue: np.ndarray, angle: np.ndarray) -> np.ndarray:
+    """Shortest signed rotation from angle to desiredValue, like angleError in main.py."""
+    return (desiredValue - angle + 180) % 360 - 180
+
+
+def stack(logs: list) -> tuple:
+    """Pad the logs into (time, error, output, valid) arrays of shape (logs, longest log)."""
+    length = max((len(log) for log in logs), default=0)
+    time = np.full((len(logs), length), np.nan)
+    error = np.full((len(logs), length), np.nan)
+    output = np.full((len(logs), length), np.nan)
+    for i, log in enumerate(logs):
+        n = len(log)
+        time[i, :n] = log["time"]
+        error[i, :n] = angleError(log["desiredValue"], log["angle"])
+        output[i, :n] = log["output"]
+    return time, error, output, ~np.isnan(time)
+
+
+def firstTrue(mask: np.ndarray) -> np.ndarray:
+    """Index of the first True in every row, -1 for rows without one."""
+    index = np.argmax(mask, axis=1)
+    return np.where(mask.any(axis=1), index, -1)
+
+
+def timeAt(time: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """time[row, index[row]] for every row, NaN where index is -1."""
+    rows = np.arange(len(time))
+    return np.where(index >= 0, time[rows, np.maximum(index, 0)], np.nan)
+
+
+def stepMetrics(time: np.ndarray, error: np.ndarray, output: np.ndarray, valid: np.ndarray, tollerance: float = 2, outputCap: float = None) -> dict:
+    """Compute every metric for stacked logs (see stack()); returns one array per metric.
+
+    outputCap is the output limit the loop ran with (speedCap); by default
+    the largest |output| in any of the logs is taken as the cap.
+    """
+    rows = np.arange(len(time))
+    lengths = valid.sum(axis=1)
+    last = np.maximum(lengths - 1, 0)
+    start = time[:, 0:1]
+    absError = np.where(valid, np.abs(error), 0.0)
+
+    # progress from the initial error towards 0, 0 = start and 1 = on target
+    initial = error[:, 0:1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        progress = np.where(initial != 0, 1 - error / initial, 1.0)
+    riseTime = timeAt(time, firstTrue(valid & (progress >= 0.9))) - timeAt(time, firstTrue(valid & (progress >= 0.1)))
+
+    outside = valid & (absError > tollerance)
+    lastOutside = outside.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+    settleIndex = np.where(outside.any(axis=1), lastOutside + 1, 0)
+    settleTime = np.where(settleIndex < lengths, timeAt(time, np.where(settleIndex < lengths, settleIndex, -1)) - start[:, 0], np.nan)
+
+    direction = np.where(initial[:, 0] < 0, -1.0, 1.0)[:, None]
+    overshoot = np.maximum(np.nanmax(np.where(valid, -direction * error, np.nan), axis=1, initial=0), 0.0)
+
+    steadyStateError = np.abs(error[rows, last])
+
+    dt = np.where(valid[:, 1:], np.diff(time, axis=1), 0.0)
+    iae = np.sum(absError[:, 1:] * dt, axis=1)
+    itae = np.sum((np.nan_to_num(time[:, 1:]) - start) * absError[:, 1:] * dt, axis=1)
+
+    absOutput = np.where(valid, np.abs(output), 0.0)
+    cap = absOutput.max() if outputCap is None else outputCap
+    saturated = valid & (absOutput >= cap * (1 - 1e-3)) if cap > 0 else np.zeros_like(valid)
+    saturation = saturated.sum(axis=1) / np.maximum(lengths, 1)
+
+    return {"riseTime": riseTime, "settleTime": settleTime, "overshoot": overshoot, "steadyStateError": steadyStateError,
+            "iae": iae, "itae": itae, "saturation": saturation}
+
+
+def computeMetrics(logs: list, tollerance: float = 2, outputCap: float = None) -> list:
+    """Return one dict per log with its file, setpoint and every metric."""
+    logs = [log for log in logs if len(log)]
+    if not logs:
+        return []
+    values = stepMetrics(*stack(logs), tollerance, outputCap)
+    return [dict({"file": os.path.basename(log.path), "setpoint": float(log["desiredValue"][0]), "start": float(log["angle"][0]), "rows": len(log)},
+                 **{name: float(values[name][i]) for name in METRICS})
+            for i, log in enumerate(logs)]
+
+
+def aggregate(results: list) -> dict:
+    """Summarize a set of logs into the numbers a baseline is compared on (lower is better)."""
+    settle = np.array([r["settleTime"] for r in results])
+    settled = settle[~np.isnan(settle)]
+    return {
+        "logs": len(results),
+        "unsettled": int(np.isnan(settle).sum()),
+        "meanSettleTime": float(settled.mean()) if len(settled) else float("nan"),
+        "worstSettleTime": float(settled.max()) if len(settled) else float("nan"),
+        "maxOvershoot": float(max(r["overshoot"] for r in results)),
+        "meanSteadyStateError": float(np.mean([r["steadyStateError"] for r in results])),
+        "meanIae": float(np.mean([r["iae"] for r in results])),
+        "meanItae": float(np.mean([r["itae"] for r in results])),
+    }
+
+
+def compare(current: dict, baseline: dict, slack: float = 0.1, absoluteSlack: float = 0.05) -> list:
+    """Return a message for every aggregate that got worse than baseline * (1 + slack) + absoluteSlack."""
+    regressions = []
+    if current["unsettled"] > baseline["unsettled"]:
+        regressions.append("unsettled: %d > %d" % (current["unsettled"], baseline["unsettled"]))
+    for key, value in current.items():
+        if key in ("logs", "unsettled") or key not in baseline:
+            continue
+        limit = baseline[key] * (1 + slack) + absoluteSlack
+        if np.isnan(value) and not np.isnan(baseline[key]) or value > limit:
+            regressions.append("%s: %.3f > %.3f (baseline %.3f)" % (key, value, limit, baseline[key]))
+    return regressions
+
+
+def printMetrics(results: list):
+    print("%-22s %8s %7s %8s %9s %7s %7s %8s %6s" % ("file", "setpoint", "rise(s)", "settle(s)", "overshoot", "sse", "IAE", "ITAE", "sat"))
+    for r in sorted(results, key=lambda r: r["setpoint"]):
+        print("%-22s %8.1f %7.2f %8.2f %9.2f %7.2f %7.1f %8.1f %6.2f" % (r["file"], r["setpoint"], r["riseTime"], r["settleTime"], r["overshoot"], r["steadyStateError"], r["iae"], r["itae"], r["saturation"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step response metrics for PID tuning logs, with a baseline regression check.")
+    parser.add_argument("paths", nargs="+", help="log files, directories or globs")
+    parser.add_argument("--tollerance", type=float, default=2, help="settle band (deg)")
+    parser.add_argument("--output-cap", type=float, default=None, help="output limit (speedCap) used for the saturation fraction")
+    parser.add_argument("--baseline", help="JSON baseline to compare against; exit code 1 on a regression")
+    parser.add_argument("--save-baseline", help="write the aggregate of these logs as a baseline")
+    parser.add_argument("--slack", type=float, default=0.1, help="allowed relative increase over the baseline")
+    parser.add_argument("--quiet", action="store_true", help="skip the per-log table")
+    args = parser.parse_args(argv)
+
+    files = telemetry.collectFiles(args.paths, "*PID*")
+    if not files:
+        print("no logs found in", " ".join(args.paths))
+        return 1
+    results = computeMetrics(telemetry.loadAll(files), args.tollerance, args.output_cap)
+    if not results:
+        print("all logs are empty")
+        return 1
+    if not args.quiet:
+        printMetrics(results)
+
+    summary = aggregate(results)
+    print("\n" + "  ".join("%s=%.3g" % item for item in summary.items()))
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+        print("baseline written to", args.save_baseline)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(summary, baseline, args.slack)
+        if regressions:
+            print("REJECTED, worse than %s:" % args.baseline)
+            for message in regressions:
+                print("  " + message)
+            return 1
+        print("accepted, no regression against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,6 @@ from vex import *
 
 # ---------------------------------------------------------------------------- #
 
-
 def arcadeDrive(left: MotorGroup, right: MotorGroup, controller: Controller):
     """
     Arcade drive using the left joystick for forward/backward movement and the right joystick for turning.
@@ -18,21 +17,12 @@ def arcadeDrive(left: MotorGroup, right: MotorGroup, controller: Controller):
     left.spin(FORWARD)
     right.spin(FORWARD)
     
-def changeDriveGraph(controller: Controller):
-    """
-    changes the constant in the DriveGraph on button press
-    """
-    global k
-    if controller.buttonUp.pressed:
-        k+=1
-    elif controller.buttonDown.pressed:
-        k-=1
-    controller.screen.clear_screen()
-    controller.screen.print(k)
-
-def driveGraph(x):
+def driveGraph(x, k: int = 2):
     """
     a simple mathemathic function to translate controller input into velocity output
+
+    for curves that can be switched from the controller, use driveCurve and
+    driveCurveSelector in main.py
     """
     if x > 0:
         return (x**k)/10**((k-1)*2)
@@ -1,38 +1,115 @@
+"""
+Plot and summarize the PID tuning logs written by main.py (turnPID*.tlm / .csv).
+
+Takes any number of log files, directories or globs, loads them in parallel
+and renders every log into one figure without opening a window:
+
+    overlay: all responses on shared axes (error and controller output vs time)
+    grid:    one panel per log with angle, desiredValue and the output
+
+Loading goes through telemetry.loadAll(), which caches parsed CSV logs
+(see telemetry.py).
+
+A summary table with the step response metrics of every log (settle time,
+overshoot, rise time, IAE, ... from metrics.py) is printed and written
+with --summary.
+
+usage:
+    python src/plotter.py path/to/sdcard
+    python src/plotter.py "logs/turnPID*.tlm" --layout grid --out tuning.pdf --summary summary.csv
+"""
+
+import argparse
+import math
 import os
 import sys
-from matplotlib import pyplot as plt
-import pandas as pd
-
-path = input("Enter the path to the CSV file: ").strip().strip('"').strip("'")
-
-if not os.path.isfile(path):
-    print("File not found:", path)
-    sys.exit(1)
-
-df = pd.read_csv(path, sep=',')
-
-if df is None:
-    print("Failed to read CSV. Try opening it in a text editor to check delimiter/encoding.")
-    sys.exit(1)
-
-print("Loaded file:", path)
-print("Columns:", list(df.columns))
-print(df.head(5))
-
-# Plotting
-angleCols = [5, 6]
-constantCols = [1, 2, 3, 4]
-xcol = 0
-
-print("Plotting x =", xcol, "y =", constantCols)
-fig, (ax1, ax2) = plt.subplots(2, sharex=True)
-ax1 = df.plot(x=xcol, y=angleCols, ax=ax1, grid=True)
-ax2 = df.plot(x=xcol, y=constantCols, ax=ax2, grid=True)
-
-ax1.set_xlabel("time (s)")
-ax1.set_ylabel("angle")
-ax2.set_xlabel("time (s)")
-ax2.set_ylabel("controller output")
-plt.legend()
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib import pyplot as plt      # noqa: E402
+import numpy as np                        # noqa: E402
+
+import metrics                            # noqa: E402
+import telemetry                          # noqa: E402
+
+
+def plotOverlay(logs: list, out: str):
+    fig, (ax1, ax2) = plt.subplots(2, sharex=True, figsize=(10, 7))
+    for log in logs:
+        label = "%s (%g)" % (os.path.splitext(os.path.basename(log.path))[0], log["desiredValue"][0])
+        ax1.plot(log["time"], metrics.angleError(log["desiredValue"], log["angle"]), label=label)
+        ax2.plot(log["time"], log["output"], label=label)
+    ax1.set_ylabel("error (deg)")
+    ax2.set_ylabel("controller output")
+    ax2.set_xlabel("time (s)")
+    for ax in (ax1, ax2):
+        ax.grid(True)
+    ax1.legend(fontsize="small", ncol=2)
+    fig.tight_layout()
+    fig.savefig(out)
+    plt.close(fig)
+
+
+def plotGrid(logs: list, out: str):
+    cols = math.ceil(math.sqrt(len(logs)))
+    rows = math.ceil(len(logs) / cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(4 * cols, 3 * rows), squeeze=False)
+    for ax, log in zip(axes.flat, logs):
+        ax.plot(log["time"], log["desiredValue"], label="desiredValue")
+        ax.plot(log["time"], log["angle"], label="angle")
+        output = ax.twinx()
+        output.plot(log["time"], log["output"], color="grey", alpha=0.5, label="output")
+        ax.set_title(os.path.basename(log.path), fontsize="small")
+        ax.grid(True)
+    for ax in list(axes.flat)[len(logs):]:
+        ax.axis("off")
+    axes[0][0].legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(out)
+    plt.close(fig)
+
+
+def writeSummary(rows: list, path: str):
+    import csv
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot and summarize PID tuning logs.")
+    parser.add_argument("paths", nargs="+", help="log files, directories or globs")
+    parser.add_argument("--layout", choices=("overlay", "grid"), default="overlay")
+    parser.add_argument("--out", default="pidPlots.png", help="output image, the extension picks the format (.png, .pdf, .svg)")
+    parser.add_argument("--summary", help="also write the summary table to this CSV file")
+    parser.add_argument("--tollerance", type=float, default=2, help="settle band (deg)")
+    parser.add_argument("--output-cap", type=float, default=None, help="output limit (speedCap) used for the saturation fraction")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse CSV logs")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    files = telemetry.collectFiles(args.paths, "*PID*")
+    if not files:
+        print("no logs found in", " ".join(args.paths))
+        return 1
+    logs = [log for log in telemetry.loadAll(files, not args.no_cache, args.workers) if len(log)]
+    if not logs:
+        print("all logs are empty")
+        return 1
+
+    rows = metrics.computeMetrics(logs, args.tollerance, args.output_cap)
+    metrics.printMetrics(rows)
+    if args.summary:
+        writeSummary(rows, args.summary)
+
+    if args.layout == "grid":
+        plotGrid(logs, args.out)
+    else:
+        plotOverlay(logs, args.out)
+    print("%d logs plotted to %s" % (len(logs), args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
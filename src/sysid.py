@@ -0,0 +1,207 @@
+"""
+System identification of the drivetrain turn response from turnPID logs.
+
+Reads every turnPID log (binary .tlm or CSV, with the channels time,
+output and angle) in a directory or glob and fits the turn plant
+
+    heading rate' = (gain * clamp(output(t - deadTime), saturation) - heading rate) / timeConstant
+
+with linear least squares on the discrete form
+
+    rate[k] = a * rate[k-1] + b * u[k-n]        a = exp(-dt / timeConstant), b = gain * (1 - a)
+
+for every dead time n (in samples) and saturation candidate, keeping the
+best fit. Each file is fitted on its own and all files together; the pooled
+model is written as JSON that sim/sweep.py and sim/harness.py load with
+--plant.
+
+With --feedforward it reads the characterize*.tlm logs of the characterize()
+routine instead (a quasi-static ramp and a step) and fits the turnPID
+feedforward gains
+
+    output = kS * sign(rate) + kV * rate + kA * rate'
+
+again searching the dead time between the output and the response.
+
+usage:
+    python src/sysid.py path/to/sdcard                 # all turnPID*.tlm/.csv in the directory
+    python src/sysid.py "logs/turnPID*.csv" --out plant.json
+    python src/sysid.py path/to/sdcard --feedforward   # kS, kV, kA from characterize*.tlm
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+import telemetry
+
+
+def findLogs(path: str, pattern: str = "turnPID*") -> list:
+    """Return the log files in a directory (turnPID*.tlm/.csv by default) or matching a glob."""
+    return telemetry.findLogs(path, pattern)
+
+
+def loadLog(path: str):
+    """Return (time, output, heading rate) of one log; the heading is unwrapped first."""
+    log = telemetry.load(path)
+    time = np.asarray(log["time"], dtype=float)
+    output = np.asarray(log["output"], dtype=float)
+    angle = np.degrees(np.unwrap(np.radians(log["angle"])))
+    dt = np.diff(time)
+    valid = dt > 0
+    rate = np.zeros(len(time) - 1)
+    rate[valid] = np.diff(angle)[valid] / dt[valid]
+    return time[:-1], output[:-1], rate, float(np.median(dt)) if len(dt) else 0.05
+
+
+def regressors(output: np.ndarray, rate: np.ndarray, delay: int, saturation: float):
+    """Build the least squares problem rate[k] = a*rate[k-1] + b*u[k-delay] for one log."""
+    u = np.clip(output, -saturation, saturation)
+    start = max(1, delay)
+    X = np.column_stack((rate[start - 1:-1], u[start - delay:len(u) - delay]))
+    y = rate[start:]
+    return X, y
+
+
+def solve(X: np.ndarray, y: np.ndarray) -> tuple:
+    """Return (a, b, R^2) of the least squares fit."""
+    if len(y) < 3:
+        return 0.0, 0.0, -np.inf
+    (a, b), *_ = np.linalg.lstsq(X, y, rcond=None)
+    residual = y - X @ np.array([a, b])
+    total = np.sum((y - y.mean()) ** 2)
+    r2 = 1 - np.sum(residual ** 2) / total if total > 0 else 0.0
+    return a, b, r2
+
+
+def toPlant(a: float, b: float, dt: float, delay: int, saturation: float, maxOutput: float, r2: float) -> dict:
+    a = float(np.clip(a, 1e-6, 1 - 1e-6))
+    return {
+        "gain": float(b / (1 - a)),
+        "timeConstant": float(-dt / np.log(a)),
+        "deadTime": delay * dt,
+        # a clamp at the largest output seen means no saturation was observed
+        "saturation": 100.0 if saturation >= maxOutput else float(saturation),
+        "r2": float(r2),
+    }
+
+
+def fit(logs: list, maxDelay: int = 4) -> dict:
+    """Fit one plant to the (time, output, rate, dt) logs, searching dead time and saturation."""
+    dt = float(np.median([log[3] for log in logs]))
+    allOutput = np.concatenate([np.abs(log[1]) for log in logs])
+    maxOutput = float(allOutput.max()) if len(allOutput) else 100.0
+    saturations = np.unique(np.percentile(allOutput, [60, 70, 80, 90, 100])) if len(allOutput) else [100.0]
+    best = None
+    for delay in range(maxDelay + 1):
+        for saturation in saturations:
+            if saturation <= 0:
+                continue
+            parts = [regressors(log[1], log[2], delay, saturation) for log in logs]
+            X = np.vstack([p[0] for p in parts])
+            y = np.concatenate([p[1] for p in parts])
+            a, b, r2 = solve(X, y)
+            if best is None or r2 > best[2]:
+                best = (a, b, r2, delay, saturation)
+    a, b, r2, delay, saturation = best
+    return toPlant(a, b, dt, delay, saturation, maxOutput, r2)
+
+
+def smooth(values: np.ndarray, window: int = 5) -> np.ndarray:
+    """Centered moving average, so the differentiated rate is not all noise."""
+    if len(values) < window:
+        return values
+    padded = np.pad(values, window // 2, mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")
+
+
+def feedforwardRegressors(log, delay: int, minRate: float) -> tuple:
+    """Build output[k] = kS*sign(rate) + kV*rate + kA*rate' with the response delay samples later."""
+    time, output, rate, dt = log
+    rate = smooth(rate)
+    acceleration = np.gradient(rate, time) if len(rate) > 1 else np.zeros_like(rate)
+    n = len(rate) - delay
+    u, rate, acceleration = output[:n], rate[delay:], acceleration[delay:]
+    # standing still says nothing about kS (the output can be anything below it)
+    moving = np.abs(rate) > minRate
+    X = np.column_stack((np.sign(rate), rate, acceleration))[moving]
+    return X, u[moving]
+
+
+def fitFeedforward(logs: list, maxDelay: int = 4, minRate: float = 5) -> dict:
+    """Fit kS, kV, kA to the (time, output, rate, dt) logs, searching the dead time."""
+    dt = float(np.median([log[3] for log in logs]))
+    best = None
+    for delay in range(maxDelay + 1):
+        parts = [feedforwardRegressors(log, delay, minRate) for log in logs]
+        X = np.vstack([p[0] for p in parts])
+        y = np.concatenate([p[1] for p in parts])
+        if len(y) < 4:
+            continue
+        gains, *_ = np.linalg.lstsq(X, y, rcond=None)
+        total = np.sum((y - y.mean()) ** 2)
+        r2 = 1 - np.sum((y - X @ gains) ** 2) / total if total > 0 else 0.0
+        if best is None or r2 > best[1]:
+            best = (gains, r2, delay)
+    if best is None:
+        raise ValueError("the logs have too few samples with the robot turning")
+    (kS, kV, kA), r2, delay = best
+    return {"kS": float(kS), "kV": float(kV), "kA": float(kA), "deadTime": delay * dt, "r2": float(r2)}
+
+
+def mainFeedforward(args) -> int:
+    files = findLogs(args.path, "characterize*")
+    if not files:
+        print("no characterize logs found in", args.path)
+        return 1
+    logs = [loadLog(path) for path in files]
+    gains = fitFeedforward(logs, args.max_delay)
+    gains["files"] = len(files)
+    print("%d logs, %d samples" % (len(files), sum(len(log[0]) for log in logs)))
+    print("kS=%.3f %%  kV=%.5f %%/(deg/s)  kA=%.5f %%/(deg/s^2)  dead time %.3f s  R^2=%.3f" % (gains["kS"], gains["kV"], gains["kA"], gains["deadTime"], gains["r2"]))
+    if gains["kV"] > 0:
+        print("top speed at 100%%: %.0f deg/s" % ((100 - gains["kS"]) / gains["kV"]))
+    print("in main.py: feedforward = feedforward(%.3f, %.5f, %.5f)" % (gains["kS"], gains["kV"], gains["kA"]))
+    out = args.out or "feedforward.json"
+    with open(out, "w") as f:
+        json.dump(gains, f, indent=2)
+    print("feedforward gains written to", out)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit a turn plant model to turnPID CSV logs.")
+    parser.add_argument("path", help="directory with turnPID*.csv files or a glob")
+    parser.add_argument("--out", help="JSON file for the pooled plant model (default plant.json, feedforward.json with --feedforward)")
+    parser.add_argument("--max-delay", type=int, default=4, help="largest dead time tried, in samples")
+    parser.add_argument("--feedforward", action="store_true", help="fit kS, kV, kA from the characterize*.tlm logs instead")
+    args = parser.parse_args(argv)
+    if args.feedforward:
+        return mainFeedforward(args)
+
+    files = findLogs(args.path)
+    if not files:
+        print("no logs found in", args.path)
+        return 1
+    logs = {path: loadLog(path) for path in files}
+
+    print("%-24s %7s %8s %8s %8s %6s %6s" % ("file", "samples", "gain", "tau(s)", "dead(s)", "sat", "R^2"))
+    for path, log in logs.items():
+        plant = fit([log], args.max_delay)
+        print("%-24s %7d %8.2f %8.3f %8.3f %6.1f %6.3f" % (os.path.basename(path), len(log[0]), plant["gain"], plant["timeConstant"], plant["deadTime"], plant["saturation"], plant["r2"]))
+
+    pooled = fit(list(logs.values()), args.max_delay)
+    pooled["files"] = len(files)
+    print("%-24s %7d %8.2f %8.3f %8.3f %6.1f %6.3f" % ("ALL", sum(len(l[0]) for l in logs.values()), pooled["gain"], pooled["timeConstant"], pooled["deadTime"], pooled["saturation"], pooled["r2"]))
+    out = args.out or "plant.json"
+    with open(out, "w") as f:
+        json.dump(pooled, f, indent=2)
+    print("plant model written to", out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
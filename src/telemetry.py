@@ -0,0 +1,193 @@
+"""
+Reader for the telemetry logs written by main.py.
+
+Binary logs (.tlm, written by sdLogWriter / PID.tune with binary=True)
+start with a header
+
+    4 bytes  magic b"VTLM"
+    1 byte   format version (1)
+    1 byte   number of channels
+    2 bytes  length of the channel name field (little endian)
+    names    channel names joined by ",", padded with spaces
+
+followed by the rows, one little endian float32 per channel. load() maps the
+rows straight into a NumPy array with np.memmap, nothing is parsed or copied.
+A row cut short by a brownout at the end of the file is ignored.
+
+CSV logs (the older format, still written with binary=False) load into the
+same telemetryLog, so every tool can take either.
+
+loadAll() loads many logs in parallel for the desktop tools (plotter.py,
+metrics.py). CSV logs are parsed once and cached as .npz files in a
+.plotcache directory next to them, keyed by the file's modification time
+and size, so re-runs only parse files that changed. Binary logs are
+memory-mapped and need no cache.
+
+usage:
+    python src/telemetry.py turnPID90.tlm                 # print channels and row count
+    python src/telemetry.py path/to/sdcard --csv          # convert every .tlm to .csv next to it
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MAGIC = b"VTLM"
+VERSION = 1
+HEADER_SIZE = 8
+CACHE_DIR = ".plotcache"
+
+
+class telemetryLog:
+    """Rows of one log as a (rows, channels) float array.
+
+    Attributes:
+        path: file the log was loaded from
+        channels: list of channel names
+        data: (rows, channels) array, read-only np.memmap for binary logs
+
+    Usage:
+        log = load("turnPID90.tlm")
+        plt.plot(log["time"], log["angle"])
+    """
+
+    def __init__(self, path: str, channels: list, data: np.ndarray):
+        self.path = path
+        self.channels = channels
+        self.data = data
+
+    def __getitem__(self, channel: str) -> np.ndarray:
+        """Return one channel (column) by name."""
+        return self.data[:, self.channels.index(channel)]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "telemetryLog(%r, %d rows, channels=%s)" % (os.path.basename(self.path), len(self), ", ".join(self.channels))
+
+    def toCsv(self, path: str):
+        """Write the log as CSV in the same layout main.py uses."""
+        with open(path, "w") as f:
+            f.write(", ".join(self.channels) + "\n")
+            np.savetxt(f, self.data, fmt="%.3f", delimiter=",")
+
+
+def readHeader(path: str) -> tuple:
+    """Return (channels, offset of the first row) of a binary log."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+            raise ValueError("%s is not a binary telemetry log" % path)
+        version, width = header[4], header[5]
+        if version != VERSION:
+            raise ValueError("%s has unsupported format version %d" % (path, version))
+        length = int.from_bytes(header[6:8], "little")
+        names = f.read(length).decode().strip()
+    channels = [name.strip() for name in names.split(",")]
+    if len(channels) != width:
+        raise ValueError("%s: header lists %d channel names for %d channels" % (path, len(channels), width))
+    return channels, HEADER_SIZE + length
+
+
+def isBinary(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == MAGIC
+
+
+def loadBinary(path: str) -> telemetryLog:
+    channels, offset = readHeader(path)
+    rowSize = 4 * len(channels)
+    rows = (os.path.getsize(path) - offset) // rowSize
+    if rows == 0:
+        return telemetryLog(path, channels, np.zeros((0, len(channels)), dtype="<f4"))
+    data = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(rows, len(channels)))
+    return telemetryLog(path, channels, data)
+
+
+def loadCsv(path: str) -> telemetryLog:
+    with open(path) as f:
+        channels = [name.strip() for name in f.readline().split(",")]
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    if data.size == 0:
+        data = np.zeros((0, len(channels)))
+    return telemetryLog(path, channels, data)
+
+
+def load(path: str) -> telemetryLog:
+    """Load a binary or CSV log, whichever the file is."""
+    return loadBinary(path) if isBinary(path) else loadCsv(path)
+
+
+def findLogs(path: str, pattern: str = "*") -> list:
+    """Return the .tlm and .csv logs in a directory (matching pattern) or matching a glob."""
+    if os.path.isdir(path):
+        files = glob.glob(os.path.join(path, pattern + ".tlm")) + glob.glob(os.path.join(path, pattern + ".csv"))
+    else:
+        files = glob.glob(path)
+    return sorted(files)
+
+
+def collectFiles(paths: list, pattern: str = "*") -> list:
+    """Expand directories (logs matching pattern) and globs into a sorted list of log files."""
+    files = set()
+    for path in paths:
+        files.update(findLogs(path, pattern) if os.path.isdir(path) else findLogs(path))
+    return sorted(files)
+
+
+def cachePath(path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, os.path.basename(path) + ".npz")
+
+
+def loadCached(path: str, useCache: bool = True) -> tuple:
+    """Return (path, channels, data) of one log, using the .npz cache for CSV logs."""
+    if isBinary(path):
+        log = loadBinary(path)
+        return path, log.channels, np.asarray(log.data, dtype=float)
+    stat = os.stat(path)
+    cache = cachePath(path)
+    if useCache and os.path.isfile(cache):
+        with np.load(cache) as cached:
+            if cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                return path, [str(c) for c in cached["channels"]], cached["data"]
+    log = loadCsv(path)
+    if useCache:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        np.savez(cache, data=log.data, channels=np.array(log.channels), mtime=stat.st_mtime_ns, size=stat.st_size)
+    return path, log.channels, log.data
+
+
+def loadAll(files: list, useCache: bool = True, workers=None) -> list:
+    """Load every file in parallel and return telemetryLogs in the same order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(loadCached, files, [useCache] * len(files)))
+    return [telemetryLog(path, channels, data) for path, channels, data in loaded]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect binary telemetry logs or convert them to CSV.")
+    parser.add_argument("path", help="log file, directory or glob")
+    parser.add_argument("--csv", action="store_true", help="write a .csv next to every binary log")
+    args = parser.parse_args(argv)
+
+    files = [f for f in findLogs(args.path) if isBinary(f)]
+    if not files:
+        print("no binary logs found in", args.path)
+        return 1
+    for path in files:
+        log = loadBinary(path)
+        print(log)
+        if args.csv:
+            out = os.path.splitext(path)[0] + ".csv"
+            log.toCsv(out)
+            print("  written to", out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())